@@ -0,0 +1,57 @@
+import os
+import threading
+from datetime import date
+
+import pandas as pd
+
+from exports import replace_parquet
+from reports import AGE_LABELS
+
+# Local store of daily ageing rollups, one Parquet file per report
+AGEING_DIR = os.environ.get('AGEING_HISTORY_DIR', '.ageing_history')
+
+# Sessions run as threads of one server; snapshots are written one at a time
+_lock = threading.Lock()
+
+
+# Function to get the path of a report's rollup file
+def _history_path(report, history_dir=AGEING_DIR):
+    return os.path.join(history_dir, f'{report}.parquet')
+
+
+# Function to load the daily ageing rollups of a report, optionally limited to [start, end].
+# One row per (Date, Bucket) with Lots, Quantity and the content key of the upload it came from.
+def load_history(report, start=None, end=None, history_dir=AGEING_DIR):
+    path = _history_path(report, history_dir)
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=['Date', 'Bucket', 'Lots', 'Quantity', 'Source'])
+
+    filters = []
+    if start is not None:
+        filters.append(('Date', '>=', pd.Timestamp(start)))
+    if end is not None:
+        filters.append(('Date', '<=', pd.Timestamp(end)))
+    return pd.read_parquet(path, filters=filters or None)
+
+
+# Function to store the ageing buckets of one report day, replacing an earlier snapshot of the same day.
+# Nothing is written when the day already holds a snapshot of the same upload.
+def save_snapshot(report, buckets, source, snapshot_date=None, history_dir=AGEING_DIR):
+    snapshot_date = pd.Timestamp(snapshot_date or date.today())
+    with _lock:
+        return _save_snapshot(report, buckets, source, snapshot_date, history_dir)
+
+
+def _save_snapshot(report, buckets, source, snapshot_date, history_dir):
+    history = load_history(report, history_dir=history_dir)
+    same_day = history['Date'] == snapshot_date
+    if same_day.any() and (history.loc[same_day, 'Source'] == source).all():
+        return False
+
+    snapshot = buckets.assign(Date=snapshot_date, Source=source)[['Date', 'Bucket', 'Lots', 'Quantity', 'Source']]
+    history = pd.concat([history[~same_day], snapshot], ignore_index=True) if len(history) else snapshot
+    history['Bucket'] = pd.Categorical(history['Bucket'], categories=AGE_LABELS, ordered=True)
+    history = history.sort_values(['Date', 'Bucket']).reset_index(drop=True)
+
+    replace_parquet(history, _history_path(report, history_dir))
+    return True
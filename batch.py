@@ -0,0 +1,120 @@
+import argparse
+import fnmatch
+import io
+import json
+import os
+import sys
+from datetime import datetime
+from functools import partial
+
+import pandas as pd
+
+from exports import write_parquet
+from recovery import gap_analysis, recovery_space_frame
+from reports import age_pending_to_pack, age_rtf_report, parse_pending_to_pack, parse_rtf_report
+from wip import WIP_WORKERS, WipStore, parse_file_date, update_wip_store
+from wip_history import save_day
+
+
+# Function to read a file from disk into an in-memory upload with a name, like st.file_uploader gives
+def read_upload(path):
+    with open(path, 'rb') as f:
+        upload = io.BytesIO(f.read())
+    upload.name = os.path.basename(path)
+    return upload
+
+
+# Function to list the files in a directory whose lower-cased name matches a glob pattern
+def find_files(input_dir, pattern):
+    return sorted(
+        os.path.join(input_dir, name) for name in os.listdir(input_dir)
+        if fnmatch.fnmatch(name.lower(), pattern.lower()) and os.path.isfile(os.path.join(input_dir, name))
+    )
+
+
+# Function to write one output table as Parquet or CSV; returns the written path
+def write_table(df, output_dir, name, fmt):
+    path = os.path.join(output_dir, f'{name}.{fmt}')
+    df = df.rename(columns=lambda c: c.strftime('%Y-%m-%d') if isinstance(c, pd.Timestamp) else c)
+    if fmt == 'csv':
+        df.to_csv(path, index=False)
+        return path
+    write_parquet(df, path)
+    return path
+
+
+# Function to run every page pipeline over a directory of files and write the results.
+# With a history_dir, the WIP days read are also saved to that WIP history.
+def run_batch(input_dir, output_dir, fmt='parquet', mode='grid', workers=WIP_WORKERS,
+              orders='*order*.xlsx', pending='*pending*.xlsx', rtfg='*rtf*.xlsx', history_dir=None):
+    os.makedirs(output_dir, exist_ok=True)
+    summary = {'started': datetime.now().isoformat(timespec='seconds'), 'outputs': [], 'errors': []}
+    wip_files = [p for p in find_files(input_dir, '*.xlsx') if parse_file_date(os.path.basename(p))]
+
+    # Page 1: WIP day-wise pivot
+    if wip_files:
+        store = WipStore()
+        on_day = partial(save_day, history_dir=history_dir) if history_dir else None
+        summary['errors'] += update_wip_store(store, [read_upload(p) for p in wip_files], workers, on_day=on_day)
+        pivot_df = store.to_frame()
+        if pivot_df is not None:
+            summary['outputs'].append(write_table(pivot_df, output_dir, 'wip_pivot', fmt))
+
+    # Page 2: best width and angle for the whole input space
+    summary['outputs'].append(write_table(recovery_space_frame(mode), output_dir, f'recovery_space_{mode}', fmt))
+
+    # Page 3: gap analysis of each order book
+    summary['opportunity'] = {}
+    for path in find_files(input_dir, orders):
+        stem = os.path.splitext(os.path.basename(path))[0]
+        try:
+            filtered_df, opportunity_percentage = gap_analysis(pd.read_excel(path), mode)
+        except Exception as e:
+            summary['errors'].append(f"Error processing {os.path.basename(path)}: {e}")
+            continue
+        summary['opportunity'][stem] = opportunity_percentage
+        summary['outputs'].append(write_table(filtered_df, output_dir, f'gap_analysis_{stem}', fmt))
+
+    # Page 4: Pending to Pack and RTFG ageing
+    for pattern, name, parse, age in [(pending, 'pending_filtered', parse_pending_to_pack, age_pending_to_pack),
+                                      (rtfg, 'rtfg_filtered', parse_rtf_report, age_rtf_report)]:
+        for path in find_files(input_dir, pattern):
+            stem = os.path.splitext(os.path.basename(path))[0]
+            try:
+                filtered_data, total = age(parse(path))
+            except Exception as e:
+                summary['errors'].append(f"Error processing {os.path.basename(path)}: {e}")
+                continue
+            summary.setdefault('totals', {})[stem] = float(total)
+            summary['outputs'].append(write_table(filtered_data, output_dir, f'{name}_{stem}', fmt))
+
+    summary['finished'] = datetime.now().isoformat(timespec='seconds')
+    with open(os.path.join(output_dir, 'summary.json'), 'w') as f:
+        json.dump(summary, f, indent=2)
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run the FRP Planning page pipelines over a directory of files.')
+    parser.add_argument('input_dir', help='directory with WIP, order book and report workbooks')
+    parser.add_argument('output_dir', help='directory the results are written to')
+    parser.add_argument('--format', choices=['parquet', 'csv'], default='parquet', help='output file format')
+    parser.add_argument('--mode', choices=['grid', 'exact'], default='grid', help='angle search used for recovery')
+    parser.add_argument('--workers', type=int, default=WIP_WORKERS, help='processes used to parse WIP workbooks')
+    parser.add_argument('--orders', default='*order*.xlsx', help='file name pattern of CBL/NCBL order books')
+    parser.add_argument('--pending', default='*pending*.xlsx', help='file name pattern of Pending to Pack reports')
+    parser.add_argument('--rtfg', default='*rtf*.xlsx', help='file name pattern of RTFG reports')
+    parser.add_argument('--history-dir', help='WIP history directory the WIP days are also saved to')
+    args = parser.parse_args(argv)
+
+    summary = run_batch(args.input_dir, args.output_dir, args.format, args.mode, args.workers,
+                        args.orders, args.pending, args.rtfg, args.history_dir)
+    for path in summary['outputs']:
+        print(f'wrote {path}')
+    for message in summary['errors']:
+        print(message, file=sys.stderr)
+    return 1 if summary['errors'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
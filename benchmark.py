@@ -0,0 +1,286 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+import numpy as np
+import openpyxl
+import pandas as pd
+
+from batch import read_upload
+from charts import chart_data
+from exports import EXPORT_FORMATS, export_file
+from recovery import W_VALUES, gap_analysis, precompute_recovery_space
+from reports import age_pending_to_pack, age_rtf_report, parse_pending_to_pack, parse_rtf_report
+from wip import WIP_WORKERS, WipStore, file_key, load_wip_sheets, read_wip_sheet
+
+# Input sizes: number of WIP days and rows per sheet, order book rows and report dump lines
+SIZES = {
+    'smoke': {'wip_files': 5, 'wip_rows': 500, 'orders': 1000, 'report_lines': 1000},
+    'realistic': {'wip_files': 30, 'wip_rows': 3000, 'orders': 20000, 'report_lines': 20000},
+    'stress': {'wip_files': 365, 'wip_rows': 10000, 'orders': 200000, 'report_lines': 200000},
+}
+
+RESOURCES = ['CBL', 'NCBL', 'CRM1', 'CRM2', 'HRM', 'FM1', 'FM2', 'ANL', 'SLT', 'PKG']
+INVENTORIES = ['HR Coil', 'CR Coil', 'Foil Stock', 'Annealed', 'Slit', 'Circle', 'Scrap', 'Rework']
+ITEMS = [f'ITM-{i:04d}' for i in range(400)]
+
+
+# Function to write rows to a workbook sheet in write-only mode, which keeps large sheets out of memory
+def _write_workbook(path, sheets):
+    wb = openpyxl.Workbook(write_only=True)
+    for name, rows in sheets.items():
+        ws = wb.create_sheet(name)
+        for row in rows:
+            ws.append(row)
+    wb.save(path)
+
+
+# Function to generate one day of the FNDWRR WIP export. Resources is only filled on the first row
+# of each machine-center block, as in the ERP export, and a title sheet comes first.
+def make_wip_workbook(path, rows, file_date, seed=0):
+    rng = np.random.default_rng(seed)
+    resources = np.sort(rng.choice(RESOURCES, rows))
+    invs = rng.choice(INVENTORIES, rows)
+    qty = rng.gamma(2.0, 4000.0, rows).round(3)
+    items = rng.choice(ITEMS, rows)
+
+    def fndwrr():
+        yield ['Resources', 'Inv', 'Item', 'Qty', 'UOM']
+        previous = None
+        for resource, inv, item, q in zip(resources, invs, items, qty):
+            yield [resource if resource != previous else None, inv, item, float(q), 'KG']
+            previous = resource
+
+    _write_workbook(path, {'Summary': [[f'WIP as on {file_date:%d-%b-%Y}']], 'FNDWRR': fndwrr()})
+
+
+# Function to generate a CBL/NCBL order book with diameters, ordered widths and input weights
+def make_order_book(path, rows, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'Resources': rng.choice(['CBL', 'NCBL', 'CRM1', 'FM1'], rows, p=[0.4, 0.4, 0.1, 0.1]),
+        'Cicle diameter': rng.choice(np.arange(100, 1001, 10), rows),
+        'Hot Rolled(base)': rng.choice(W_VALUES, rows),
+        'Input': rng.uniform(500, 5000, rows).round(2),
+    })
+    _write_workbook(path, {'Orders': [list(df.columns), *df.itertuples(index=False, name=None)]})
+
+
+# Function to generate a fixed-width ERP dump ('pending' or 'rtfg') stored one line per cell in column A
+def make_report_dump(path, kind, lines, seed=0):
+    rng = np.random.default_rng(seed)
+    today = datetime.today()
+    lots = [f'L{i:08d}' for i in range(lines)]
+    items = rng.choice(ITEMS, lines)
+    dates = [(today - timedelta(days=int(d))).strftime('%d-%b-%Y').upper() for d in rng.integers(0, 30, lines)]
+    origins = [(today - timedelta(days=int(d))).strftime('%d-%b-%Y').upper() for d in rng.integers(30, 90, lines)]
+    qty = rng.integers(1, 5000, lines)
+
+    if kind == 'pending':
+        head = ['PENDING TO PACK REPORT',
+                f"{'Lot Number':<16}{'Item Code':<16}{'Pack':>6}  {'Lot Qty':>8}  {'Ordr Status':<13}{'Line No':<12}"]
+        # Some lots carry no order status date and fall back to the line date
+        status = np.where(rng.random(lines) < 0.2, '', dates)
+        body = (f'{lot:<16}{item:<16}{q % 40:>6}  {q:>8}  {s:<13}{o:<12}'
+                for lot, item, q, s, o in zip(lots, items, qty, status, origins))
+    else:
+        head = ['RTFG REPORT', '-' * 20,
+                f"{'Lot Number':<16}{'Item Code':<16}{'Pieces':>6}  {'Creation Date':<15}{'Parent Lot Origin':<17}"]
+        body = (f'{lot:<16}{item:<16}{q:>6}  {d:<15}{o:<17}'
+                for lot, item, q, d, o in zip(lots, items, qty, dates, origins))
+    _write_workbook(path, {'Report': ([line] for line in [*head, *body])})
+
+
+# Function to generate (or reuse) every input of one size in work_dir; returns the paths by input kind
+def generate_inputs(work_dir, size, seed=0):
+    spec = SIZES[size]
+    data_dir = os.path.join(work_dir, f'{size}_seed{seed}')
+    os.makedirs(data_dir, exist_ok=True)
+
+    first_day = datetime(2025, 1, 1)
+    wip_paths = []
+    for day in range(spec['wip_files']):
+        file_date = first_day + timedelta(days=day)
+        path = os.path.join(data_dir, f'Alloy_Product_Wise_Summery__RK_{file_date:%d%m%y}.xlsx')
+        if not os.path.exists(path):
+            make_wip_workbook(path, spec['wip_rows'], file_date, seed + day)
+        wip_paths.append(path)
+
+    paths = {'wip': wip_paths}
+    for kind, make in [('orders', lambda p: make_order_book(p, spec['orders'], seed)),
+                       ('pending', lambda p: make_report_dump(p, 'pending', spec['report_lines'], seed)),
+                       ('rtfg', lambda p: make_report_dump(p, 'rtfg', spec['report_lines'], seed))]:
+        path = os.path.join(data_dir, f'{kind}.xlsx')
+        if not os.path.exists(path):
+            make(path)
+        paths[kind] = path
+    return paths
+
+
+# Function to time one stage: the best wall time of repeat untraced runs, then one traced run for peak memory.
+# setup() builds fresh arguments for every run so that no run benefits from the one before;
+# rows is a count, or a function giving the count from the stage result.
+def measure(name, func, setup=lambda: (), rows=None, files=None, repeat=3):
+    times = []
+    for _ in range(repeat):
+        args = setup()
+        start = time.perf_counter()
+        result = func(*args)
+        times.append(time.perf_counter() - start)
+
+    args = setup()
+    tracemalloc.start()
+    try:
+        func(*args)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    seconds = min(times)
+    if callable(rows):
+        rows = rows(result)
+    record = {'stage': name, 'seconds': round(seconds, 4), 'mean_seconds': round(float(np.mean(times)), 4),
+              'peak_mb': round(peak / 2**20, 2), 'rows': rows, 'files': files}
+    record['rows_per_s'] = round(rows / seconds, 1) if rows and seconds else None
+    record['files_per_s'] = round(files / seconds, 2) if files and seconds else None
+    print(f"{name:<32}{seconds:>10.4f} s{record['peak_mb']:>10.1f} MB"
+          + (f"{record['rows_per_s']:>14,.0f} rows/s" if record['rows_per_s'] else ''))
+    return record, result
+
+
+# Function to run every pipeline stage of the four pages over the generated inputs
+def run_benchmarks(paths, work_dir, repeat=3, modes=('grid',)):
+    records = []
+    wip_uploads = [read_upload(p) for p in paths['wip']]
+
+    # Page 1: sheet parsing, disk cache reads, the day-wise pivot and the trend chart data
+    dates = [datetime.strptime(os.path.basename(p)[-11:-5], '%d%m%y') for p in paths['wip']]
+    record, sheets = measure('wip: parse sheets', lambda: [read_wip_sheet(f.getvalue(), d) for f, d in zip(wip_uploads, dates)],
+                             rows=lambda sheets: sum(len(df) for df in sheets), files=len(wip_uploads), repeat=1)
+    records.append(record)
+    wip_rows = record['rows']
+
+    # Parallel parse into an empty cache, as on a first upload
+    def empty_cache():
+        return (tempfile.mkdtemp(dir=work_dir),)
+
+    def parallel_load(cache_dir):
+        try:
+            return load_wip_sheets(list(zip(wip_uploads, dates)), WIP_WORKERS, cache_dir)
+        finally:
+            shutil.rmtree(cache_dir, ignore_errors=True)
+
+    records.append(measure(f'wip: parallel parse ({WIP_WORKERS} workers)', parallel_load, setup=empty_cache,
+                           rows=wip_rows, files=len(wip_uploads), repeat=1)[0])
+
+    cache_dir = os.path.join(work_dir, 'wip_cache')
+    load_wip_sheets(list(zip(wip_uploads, dates)), workers=1, cache_dir=cache_dir)
+    records.append(measure('wip: load from disk cache', lambda: load_wip_sheets(list(zip(wip_uploads, dates)), 1, cache_dir),
+                           rows=wip_rows, files=len(wip_uploads), repeat=repeat)[0])
+
+    def fill_store():
+        store = WipStore()
+        for file_date, df in zip(dates, sheets):
+            store.set_day(file_date, df, file_key(b'', file_date))
+        return store
+
+    records.append(measure('wip: fill store', fill_store, rows=wip_rows, files=len(sheets), repeat=repeat)[0])
+    store = fill_store()
+    record, pivot_df = measure('wip: pivot', lambda s: s.to_frame(), setup=lambda: (fill_store(),),
+                               rows=wip_rows, repeat=repeat)
+    records.append(record)
+    records.append(measure('wip: rollup cube', lambda s: s.cube(), setup=lambda: (fill_store(),),
+                           rows=len(pivot_df), repeat=repeat)[0])
+    cube = store.cube()
+    selection = list(cube.resource_codes)[:3], list(cube.inv_codes)[:3]
+    records.append(measure('wip: select trend', lambda: chart_data(cube.select(*selection)),
+                           rows=len(cube.dates), repeat=repeat)[0])
+
+    # Page 2: whole input space of the recovery sweep
+    for mode in modes:
+        records.append(measure(f'recovery: precompute ({mode})', lambda: precompute_recovery_space(mode=mode),
+                               rows=91 * 16 * 131, repeat=1)[0])
+
+    # Page 3: order book read and gap analysis
+    record, orders = measure('orders: read_excel', pd.read_excel, setup=lambda: (read_upload(paths['orders']),),
+                             rows=len, repeat=1)
+    records.append(record)
+    for mode in modes:
+        record, (filtered_df, _) = measure(f'orders: gap analysis ({mode})', lambda: gap_analysis(orders, mode),
+                                           rows=len(orders), repeat=repeat)
+        records.append(record)
+    for fmt in EXPORT_FORMATS:
+        records.append(measure(f'orders: export {fmt}', lambda: export_file(filtered_df, fmt),
+                               rows=len(filtered_df), repeat=repeat)[0])
+
+    # Page 4: fixed-width report parsing and ageing
+    for kind, parse, age in [('pending', parse_pending_to_pack, age_pending_to_pack),
+                             ('rtfg', parse_rtf_report, age_rtf_report)]:
+        record, parsed = measure(f'{kind}: parse', parse, setup=lambda: (read_upload(paths[kind]),), rows=len, repeat=1)
+        records.append(record)
+        records.append(measure(f'{kind}: age', age, setup=lambda: (parsed,), rows=len(parsed), repeat=repeat)[0])
+
+    return records
+
+
+# Function to print each stage's time against a saved result: ratios above 1 are slower than before
+def compare(records, baseline_path):
+    with open(baseline_path) as f:
+        baseline = {r['stage']: r for r in json.load(f)['stages']}
+    print(f"\n{'stage':<32}{'before':>10}{'after':>10}{'ratio':>8}")
+    for record in records:
+        before = baseline.get(record['stage'])
+        if before and before['seconds']:
+            print(f"{record['stage']:<32}{before['seconds']:>10.4f}{record['seconds']:>10.4f}"
+                  f"{record['seconds'] / before['seconds']:>8.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the FRP Planning pipelines on synthetic inputs.')
+    parser.add_argument('--size', choices=list(SIZES), default='realistic', help='input size to generate')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the synthetic inputs')
+    parser.add_argument('--repeat', type=int, default=3, help='timed runs per stage; the best is reported')
+    parser.add_argument('--modes', default='grid', help='comma-separated angle search modes to benchmark')
+    parser.add_argument('--work-dir', default='.bench_data', help='directory the generated inputs are kept in')
+    parser.add_argument('--output-dir', default='bench_results', help='directory the results are saved to')
+    parser.add_argument('--compare', help='saved result file to compare this run against')
+    args = parser.parse_args(argv)
+
+    print(f'Generating {args.size} inputs in {args.work_dir} ...')
+    paths = generate_inputs(args.work_dir, args.size, args.seed)
+    records = run_benchmarks(paths, args.work_dir, args.repeat, tuple(args.modes.split(',')))
+
+    result = {
+        'started': datetime.now().isoformat(timespec='seconds'),
+        'size': args.size,
+        'inputs': SIZES[args.size],
+        'seed': args.seed,
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+        },
+        'stages': records,
+    }
+    os.makedirs(args.output_dir, exist_ok=True)
+    path = os.path.join(args.output_dir, f"{args.size}_{datetime.now():%Y%m%d_%H%M%S}.json")
+    with open(path, 'w') as f:
+        json.dump(result, f, indent=2)
+    print(f'\nsaved {path}')
+
+    if args.compare:
+        compare(records, args.compare)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
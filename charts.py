@@ -0,0 +1,53 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+# Most points sent to the browser per trend line, about one per pixel of a wide chart
+CHART_POINTS = int(os.environ.get('CHART_POINTS', '1200'))
+
+# Lines longer than this are drawn with WebGL instead of SVG
+WEBGL_MIN_POINTS = 1000
+
+# Markers are only drawn while a line has few enough points to tell them apart
+MARKER_MAX_POINTS = 120
+
+
+# Function to pick n_out points of a line with Largest-Triangle-Three-Buckets.
+# The first and last points are kept; from each bucket in between the point forming the largest triangle
+# with the previously picked point and the mean of the next bucket is kept. Returns the picked positions.
+def lttb_indices(x, y, n_out):
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype='float64')
+    y = np.asarray(y, dtype='float64')
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    picked = np.empty(n_out, dtype=int)
+    picked[0], picked[-1] = 0, n - 1
+
+    a = 0
+    for k in range(n_out - 2):
+        lo, hi = edges[k], edges[k + 1]
+        if k + 2 < len(edges):
+            next_x = x[hi:edges[k + 2]].mean()
+            next_y = y[hi:edges[k + 2]].mean()
+        else:
+            next_x, next_y = x[-1], y[-1]
+        area = np.abs((x[a] - next_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (next_y - y[a]))
+        a = lo + int(np.argmax(area))
+        picked[k + 1] = a
+    return picked
+
+
+# Function to prepare a daily series for a trend chart: the [start, end] window is cut out, then reduced
+# to at most max_points. Returns (series, render_mode, markers) for px.line.
+def chart_data(series, start=None, end=None, max_points=CHART_POINTS):
+    window = series.loc[pd.Timestamp(start) if start is not None else None:
+                        pd.Timestamp(end) if end is not None else None]
+    if len(window) > max_points:
+        x = window.index.asi8 if isinstance(window.index, pd.DatetimeIndex) else np.arange(len(window))
+        window = window.iloc[lttb_indices(x, window.to_numpy(), max_points)]
+    render_mode = 'webgl' if len(window) >= WEBGL_MIN_POINTS else 'svg'
+    return window, render_mode, len(window) <= MARKER_MAX_POINTS
@@ -0,0 +1,72 @@
+import gzip
+import io
+import os
+import threading
+
+from profiling import timed
+
+# Download formats: label -> (file extension, MIME type)
+EXPORT_FORMATS = {
+    'CSV': ('csv', 'text/csv'),
+    'CSV (gzip)': ('csv.gz', 'application/gzip'),
+    'Parquet': ('parquet', 'application/vnd.apache.parquet'),
+}
+
+# Rows serialised per CSV chunk
+CHUNK_ROWS = 50000
+
+
+# Function to write a frame as CSV into a binary stream, CHUNK_ROWS rows at a time
+def write_csv(df, stream, chunk_rows=CHUNK_ROWS):
+    text = io.TextIOWrapper(stream, encoding='utf-8', newline='', write_through=True)
+    try:
+        df.iloc[:0].to_csv(text, index=False)
+        for start in range(0, len(df), chunk_rows):
+            df.iloc[start:start + chunk_rows].to_csv(text, index=False, header=False)
+    finally:
+        text.detach()
+
+
+# Function to write a frame as compressed Parquet; mixed text / number columns are stored as text
+def write_parquet(df, target, compression='zstd'):
+    try:
+        df.to_parquet(target, index=False, compression=compression)
+    except (TypeError, ValueError):
+        if hasattr(target, 'seek'):
+            target.seek(0)
+            target.truncate()
+        df = df.astype({col: str for col in df.columns if df[col].dtype == object})
+        df.to_parquet(target, index=False, compression=compression)
+
+
+# Function to save a frame as a Parquet file that readers never see half written: it is written to a hidden
+# temporary file in the same directory and moved into place. The leading '.' keeps Parquet dataset scans of
+# the directory from reading the temporary file.
+def replace_parquet(df, path):
+    directory, name = os.path.split(path)
+    os.makedirs(directory or '.', exist_ok=True)
+    tmp_path = os.path.join(directory, f'.{name}.{os.getpid()}.{threading.get_ident()}.tmp')
+    try:
+        df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+# Function to build a download of a frame in one of EXPORT_FORMATS; returns a BytesIO at position 0.
+# Pass it to st.download_button through a callable so that it is only built when the button is clicked.
+@timed('encode download')
+def export_file(df, fmt='CSV', chunk_rows=CHUNK_ROWS):
+    out = io.BytesIO()
+    if fmt == 'CSV':
+        write_csv(df, out, chunk_rows)
+    elif fmt == 'CSV (gzip)':
+        with gzip.GzipFile(fileobj=out, mode='wb', compresslevel=6) as gz:
+            write_csv(df, gz, chunk_rows)
+    elif fmt == 'Parquet':
+        write_parquet(df, out)
+    else:
+        raise ValueError(f'Unknown export format: {fmt}')
+    out.seek(0)
+    return out
@@ -0,0 +1,113 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import streamlit as st
+
+# Threads running background jobs for all sessions
+JOB_WORKERS = int(os.environ.get('JOB_WORKERS', '2'))
+
+# Finished jobs kept so that reruns and other sessions can pick up their results
+JOB_HISTORY = 100
+
+
+# One background job: progress counters, then its result or error once finished
+class Job:
+    def __init__(self, key, label, total):
+        self.key = key
+        self.label = label
+        self.total = total
+        self.done = 0
+        self.result = None
+        self.error = None
+        self.finished = False
+        self.started = time.time()
+
+    # Function given to the job body to report how many of its steps are done
+    def progress(self, done, total=None):
+        self.done = done
+        if total is not None:
+            self.total = total
+
+
+# Server-wide executor of background jobs. A job keeps running across reruns; submitting a key that is
+# already running or finished returns that job instead of starting the work again.
+class JobManager:
+    def __init__(self, workers=JOB_WORKERS, history=JOB_HISTORY):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='job')
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self.history = history
+
+    # Function to start func(progress) in the background under key, unless that key is already known
+    def submit(self, key, func, label, total=1):
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None:
+                self._jobs.move_to_end(key)
+                return job
+            job = self._jobs[key] = Job(key, label, total)
+            self._trim()
+        self._executor.submit(self._run, job, func)
+        return job
+
+    def _run(self, job, func):
+        try:
+            job.result = func(job.progress)
+        except Exception as e:
+            job.error = e
+        finally:
+            job.finished = True
+
+    # Function to drop the oldest finished jobs beyond the history size
+    def _trim(self):
+        finished = [key for key, job in self._jobs.items() if job.finished]
+        for key in finished[:max(0, len(self._jobs) - self.history)]:
+            del self._jobs[key]
+
+    def get(self, key):
+        with self._lock:
+            return self._jobs.get(key)
+
+    # Function to forget a job, so that the next submit of its key runs it again
+    def forget(self, key):
+        with self._lock:
+            self._jobs.pop(key, None)
+
+
+# Function to show a job's progress until it finishes, then rerun the page once.
+# Returns the result of a finished job, None while it runs or when it failed (the error is shown with a retry button).
+def wait_for(jobs, job):
+    if job.finished:
+        if job.error is not None:
+            st.error(f"{job.label} failed: {job.error}")
+            if st.button("Retry", key=f"retry_{job.key}"):
+                jobs.forget(job.key)
+                st.rerun()
+            return None
+        return job.result
+
+    @st.fragment(run_every=0.5)
+    def show_progress():
+        total = max(job.total, 1)
+        st.progress(min(job.done / total, 1.0), text=f"{job.label}: {job.done} of {job.total} done")
+        if job.finished:
+            st.rerun(scope='app')
+
+    show_progress()
+    return None
+
+
+# Function to get a dataset from the shared registry, computing it in a background job on a miss.
+# Returns None while the job runs or when it failed.
+def compute_in_background(jobs, registry, key, compute, label):
+    value = registry.get(key)
+    if value is not None:
+        return value
+
+    job = jobs.submit(key, lambda progress: registry.get_or_compute(key, compute) is not None, label)
+    if wait_for(jobs, job) is None:
+        return None
+    return registry.get_or_compute(key, compute)
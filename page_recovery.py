@@ -0,0 +1,224 @@
+import re
+
+import pandas as pd
+import plotly.express as px
+import streamlit as st
+
+from exports import EXPORT_FORMATS, export_file
+from profiling import stage
+from recovery import CASE_COLUMNS, W_VALUES, batch_recovery, best_recovery, precompute_recovery_space
+
+
+# The whole input space is evaluated once per server and mode; each input set is then a lookup
+@st.cache_resource
+def load_recovery_space(mode):
+    precompute_recovery_space(mode=mode)
+
+
+# Function to read a batch of cases from an uploaded CSV / Excel file. The diameter column is required;
+# gap columns that are missing or empty take the given defaults.
+def read_cases(uploaded_file, disc_to_disc, disc_to_border):
+    if uploaded_file.name.lower().endswith('.csv'):
+        df = pd.read_csv(uploaded_file)
+    else:
+        df = pd.read_excel(uploaded_file)
+
+    # Match columns loosely: 'Diameter', 'Disc to Disc gap', 'Border' ...
+    found = {}
+    for col in df.columns:
+        name = str(col).lower()
+        if 'diam' in name:
+            found.setdefault(CASE_COLUMNS[0], col)
+        elif 'disc to disc' in name or 'disc gap' in name:
+            found.setdefault(CASE_COLUMNS[1], col)
+        elif 'border' in name:
+            found.setdefault(CASE_COLUMNS[2], col)
+    if CASE_COLUMNS[0] not in found:
+        raise ValueError("No diameter column found")
+
+    cases = pd.DataFrame({name: pd.to_numeric(df[col], errors='coerce') for name, col in found.items()})
+    cases = cases.reindex(columns=CASE_COLUMNS)
+    cases[CASE_COLUMNS[1]] = cases[CASE_COLUMNS[1]].fillna(disc_to_disc)
+    cases[CASE_COLUMNS[2]] = cases[CASE_COLUMNS[2]].fillna(disc_to_border)
+    return cases.dropna(subset=[CASE_COLUMNS[0]]).reset_index(drop=True)
+
+
+# Function to build a batch of cases from typed diameters like "250, 300 350"
+def parse_cases(text, disc_to_disc, disc_to_border):
+    diameters = [float(value) for value in re.split(r'[\s,;]+', text.strip()) if value]
+    return pd.DataFrame({
+        CASE_COLUMNS[0]: diameters,
+        CASE_COLUMNS[1]: float(disc_to_disc),
+        CASE_COLUMNS[2]: float(disc_to_border),
+    })
+
+
+# Page 2: Circle Best recovery figure
+def render(registry, jobs):
+    st.image('logo_hil.jpg', width=100)
+    st.title("Circle Best recovery %")
+
+    view = st.radio("Optimize", ["Single diameter", "Batch of diameters"], horizontal=True)
+    angle_mode = st.radio("Angle search", ["Grid (1.5° steps)", "Exact (30° to 60°)"], horizontal=True)
+    mode = 'exact' if angle_mode.startswith("Exact") else 'grid'
+
+    if view == "Batch of diameters":
+        render_batch(mode)
+    else:
+        render_single(mode)
+
+
+# Batch mode: many diameters and gap settings against an editable coil-width catalogue
+def render_batch(mode):
+    disc_to_disc = st.number_input("Default Disc to Disc gap in mm:", min_value=5, max_value=20, value=5, step=1)
+    disc_to_border = st.number_input("Default Disc to Border gap in mm:", min_value=20, max_value=150, value=30, step=1)
+
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        text = st.text_area("Disc diameters in mm (comma or space separated)", "250, 300, 350, 400")
+        uploaded_file = st.file_uploader("...or upload diameters (CSV / Excel with a Diameter column and optional gap columns)",
+                                         type=["csv", "xlsx"])
+    with col2:
+        catalogue = st.data_editor(pd.DataFrame({"Width (mm)": W_VALUES}), num_rows="dynamic", key="width_catalogue")
+
+    try:
+        if uploaded_file is not None:
+            cases = read_cases(uploaded_file, disc_to_disc, disc_to_border)
+        else:
+            cases = parse_cases(text, disc_to_disc, disc_to_border)
+    except ValueError as e:
+        st.error(f"Could not read the diameters: {e}")
+        return
+
+    widths = pd.to_numeric(catalogue["Width (mm)"], errors="coerce").dropna()
+    widths = widths[widths > 0]
+    if cases.empty or widths.empty:
+        st.error("Enter at least one diameter and one coil width.")
+        return
+
+    summary, matrix = batch_recovery(cases, widths.to_numpy(), mode)
+    if summary['% Recovery'].isna().any():
+        st.warning(f"{summary['% Recovery'].isna().sum()} case(s) fit on none of the coil widths.")
+
+    st.subheader("Best Width for Each Diameter")
+    st.dataframe(summary.round(2), hide_index=True)
+
+    # Diameter x width heat map of the best recovery over angles
+    labels = [f"{d:g} ({g:g}/{e:g})" for d, g, e in summary[CASE_COLUMNS].itertuples(index=False)]
+    fig = px.imshow(matrix.to_numpy(), x=[f"{w:g}" for w in matrix.columns], y=labels,
+                    labels={"x": "Coil Width (mm)", "y": "Diameter (disc / border gap)", "color": "Recovery (%)"},
+                    color_continuous_scale="Viridis", text_auto=".1f", aspect="auto",
+                    title="Recovery % by Diameter and Coil Width")
+    fig.update_layout(height=max(400, 28 * len(labels) + 150))
+    with stage('render recovery heat map') as record:
+        record['rows'] = matrix.size
+        st.plotly_chart(fig, use_container_width=True)
+
+    export_format = st.radio("Download format", list(EXPORT_FORMATS), horizontal=True)
+    extension, mime = EXPORT_FORMATS[export_format]
+    st.download_button("Download batch results", lambda: export_file(summary, export_format),
+                       f"batch_recovery.{extension}", mime=mime)
+
+
+# Single mode: one diameter and gap setting against the standard coil widths
+def render_single(mode):
+        # Inputs for b and t from user
+    b = st.number_input("Enter the disc diameter (b) in mm:", min_value=100, max_value=1000, value=250, step=10)
+    disc_to_disc = st.number_input("Enter the Disc to Disc gap in mm:", min_value=5, max_value=20, value=5, step=1)
+    disc_to_border = st.number_input("Enter the Disc to Border gap in mm:", min_value=20, max_value=150, value=30, step=1)
+
+    load_recovery_space(mode)
+    with stage('best recovery lookup'):
+        result = best_recovery(b, disc_to_disc, disc_to_border, mode=mode)
+    best_w = result.best_width
+    best_angle = result.best_angle
+    max_recovery = result.best_recovery
+
+    # # Display the optimal coil width, angle, and maximum recovery
+    # st.subheader("Optimal Recovery Results")
+    # st.write(f"**Optimal coil width:** {best_w} mm")
+    # st.write(f"**Optimal angle:** {best_angle:.2f}°")
+    # st.write(f"**Maximum recovery percentage:** {max_recovery:.2f}%")
+
+    # Custom HTML for a light pink rounded box
+    box_style = """
+        <div style="
+            background-color: #d3d9e7; 
+            border-radius: 10px; 
+            padding: 20px; 
+            margin: 10px 0px;
+            box-shadow: 2px 2px 8px rgba(0, 0, 0, 0.1);
+        ">
+        <h3 style="color: #333333;">Optimal Recovery Results 🔍</h3>
+        <p><b>Optimal coil width:</b> {best_w} mm</p>
+        <p><b>Optimal angle:</b> {best_angle:.2f}°</p>
+        <p><b>Maximum recovery percentage:</b> {max_recovery:.2f}%</p>
+        </div>
+    """.format(best_w=best_w, best_angle=best_angle, max_recovery=max_recovery)
+
+    # Display the custom box using st.markdown
+    st.markdown(box_style, unsafe_allow_html=True)
+
+    # Best angle for each width, taken straight from the recovery grid
+    df_best_recovery = pd.DataFrame({
+        "Width (mm)": result.widths,
+        "Angle (°)": result.width_angle,
+        "% Recovery": result.width_recovery,
+    })
+
+    # Round the recovery percentage and angle to 2 decimal places
+    df_best_recovery["% Recovery"] = df_best_recovery["% Recovery"].round(2)
+    df_best_recovery["Angle (°)"] = df_best_recovery["Angle (°)"].round(2)
+
+    # Display the optimal coil width, angle, and maximum recovery with rounded values
+    st.subheader("Recovery % for Each Width")
+    st.dataframe(df_best_recovery)
+
+    # Create two columns
+    #col1, col2 = st.columns(2)
+
+    # # Display df_recovery in the first column
+    # with col1:
+    #     st.subheader("All possible combinations of width and angles")
+    #     st.dataframe(df_recovery)
+
+    # # Display df_best_recovery in the second column
+    # with col2:
+    #     st.subheader("Best possible Recovery for Each Width")
+    #     st.dataframe(df_best_recovery)
+
+    
+    # Assuming df_best_recovery is already defined and has columns "Width (mm)" and "% Recovery"
+    w_values = df_best_recovery["Width (mm)"].unique()  # Get unique coil widths
+
+    # Create a bar graph with Plotly
+    fig = px.bar(df_best_recovery, 
+                x="Width (mm)", 
+                y="% Recovery", 
+                text="% Recovery",  # Add data labels on top of bars
+                title=" Recovery for Each Width📈",
+                labels={"% Recovery": "Recovery (%)", "Width (mm)": "Coil Width (mm)"},
+                height=500)
+
+    # Customize the appearance of the bar graph
+    fig.update_traces(
+        texttemplate='%{text:.2f}',  # Format data labels to 2 decimal places
+        textposition='outside',
+        textfont=dict(size=14, color='black', family='Arial', weight="bold")  # Increase size and make text bold
+    )
+
+    fig.update_layout(
+        yaxis_title="Recovery (%)", 
+        xaxis_title="Coil Width (mm)", 
+        xaxis=dict(
+            tickvals=w_values  # Set x-axis tick values to the unique coil widths
+        ),
+        uniformtext_minsize=8, 
+        uniformtext_mode='hide',
+        bargap=0.1  # Adjust space between bars if needed
+    )
+
+    # Display the bar chart in Streamlit
+    with stage('render recovery chart') as record:
+        record['rows'] = len(df_best_recovery)
+        st.plotly_chart(fig, use_container_width=True)  # Enable dynamic width  
@@ -0,0 +1,128 @@
+from datetime import date, datetime, timedelta
+
+import plotly.express as px
+import streamlit as st
+
+from ageing import load_history, save_snapshot
+from exports import EXPORT_FORMATS, export_file
+from jobs import compute_in_background
+from profiling import stage
+from registry import content_key
+from reports import AGE_LABELS, ageing_buckets, parse_pending_to_pack, age_pending_to_pack, parse_rtf_report, age_rtf_report
+
+# Reports with stored ageing snapshots: label -> history name
+TREND_REPORTS = {"Pending to Pack": "pending_to_pack", "RTFG": "rtf_report"}
+
+
+# Function to show the ageing buckets of a parsed report and store them as today's snapshot
+def show_buckets(report, parsed, date_col, qty_col, source):
+    with stage('ageing buckets') as record:
+        buckets = ageing_buckets(parsed, date_col, qty_col)
+        record['rows'] = len(parsed)
+    save_snapshot(report, buckets, source)
+    st.dataframe(buckets, hide_index=True)
+
+
+# Ageing trend over the stored daily snapshots, without re-reading any report
+def render_trend():
+    st.markdown('<div class="title">Ageing Trend</div>', unsafe_allow_html=True)
+    col1, col2, col3 = st.columns(3)
+    report = col1.radio("Report", list(TREND_REPORTS), horizontal=True)
+    measure = col2.radio("Measure", ["Quantity", "Lots"], horizontal=True)
+    start = col3.date_input("From", date.today() - timedelta(weeks=8))
+
+    history = load_history(TREND_REPORTS[report], start=start)
+    if history.empty:
+        st.info("No snapshots stored for this period yet. Each processed report adds one for its day.")
+        return
+
+    fig = px.area(history, x='Date', y=measure, color='Bucket', category_orders={'Bucket': AGE_LABELS},
+                  title=f'{report} ageing by day', markers=True)
+    st.plotly_chart(fig, use_container_width=True)
+
+
+# Page 4: RTFG & PP report
+def render(registry, jobs):
+    st.image('logo_hil.jpg', width=100)
+
+    #st.title(page_title="Renukoot FRP ", layout="wide")
+
+    st.markdown("<h1 style='text-align: center; color: #003366; font-size: 36px;'>Renukoot FRP</h1>", unsafe_allow_html=True)
+
+
+    # Page styling
+    st.markdown(
+        """
+        <style>
+        .title {
+            font-size: 25px;
+            color: #0047AB;
+            font-weight: bold;
+        }
+        .colored-box {
+            background-color: #d4edda;
+            color: #155724;
+            padding: 15px;
+            border: 1px solid #c3e6cb;
+            border-radius: 5px;
+            font-size: 18px;
+            margin-top: 20px;
+        }
+        </style>
+        """,
+        unsafe_allow_html=True,
+    )
+
+    st.markdown('<div class="title">Daily Reports Processing</div>', unsafe_allow_html=True)
+
+    # Upload section
+    col1, col2 = st.columns(2)
+
+    with col1:
+        
+        pending_file = st.file_uploader("Upload Pending to Pack Report", type=["xlsx"])
+
+    with col2:
+        rtf_file = st.file_uploader("Upload RTFG Report", type=["xlsx"])
+
+    # Downloads are only built when a button is clicked
+    if pending_file or rtf_file:
+        export_format = st.radio("Download format", list(EXPORT_FORMATS), horizontal=True)
+        extension, mime = EXPORT_FORMATS[export_format]
+
+    # Process and display results for Pending to Pack report
+    if pending_file:
+        st.markdown('<div class="title">Pending to Pack Report</div>', unsafe_allow_html=True)
+        key = content_key('pending_to_pack', pending_file.getvalue())
+        parsed = compute_in_background(jobs, registry, key, lambda: parse_pending_to_pack(pending_file),
+                                       "Parsing the Pending to Pack report")
+        if parsed is not None:
+            with stage('age Pending to Pack') as record:
+                pending_data, pending_sum = age_pending_to_pack(parsed)
+                record['rows'] = len(pending_data)
+            st.write(pending_data)
+        
+            today = datetime.today()
+            st.write(today)
+            st.markdown(f'<div class="colored-box">Total Quantity Kg(Pending to Pack): {pending_sum}</div>', unsafe_allow_html=True)
+            show_buckets('pending_to_pack', parsed, 'Final_Date', 'Lot Qty', key)
+            st.download_button("Download Pending Filtered Data", lambda: export_file(pending_data, export_format),
+                               f"pending_filtered.{extension}", mime=mime)
+
+    # Process and display results for RTFG report
+    if rtf_file:
+        st.markdown('<div class="title">RTFG Report</div>', unsafe_allow_html=True)
+        key = content_key('rtf_report', rtf_file.getvalue())
+        parsed = compute_in_background(jobs, registry, key, lambda: parse_rtf_report(rtf_file),
+                                       "Parsing the RTFG report")
+        if parsed is not None:
+            with stage('age RTFG') as record:
+                rtf_data, rtf_sum = age_rtf_report(parsed)
+                record['rows'] = len(rtf_data)
+            st.write(rtf_data)
+            st.markdown(f'<div class="colored-box">Total Quantity Kg(RTFG): {rtf_sum}</div>', unsafe_allow_html=True)
+            show_buckets('rtf_report', parsed, 'Creation Date', 'Quantity', key)
+            st.download_button("Download RTFG Filtered Data", lambda: export_file(rtf_data, export_format),
+                               f"rtfg_filtered.{extension}", mime=mime)
+
+    render_trend()
@@ -0,0 +1,94 @@
+import pandas as pd
+import streamlit as st
+
+from exports import EXPORT_FORMATS, export_file
+from jobs import compute_in_background
+from profiling import stage
+from recovery import W_VALUES, assign_widths, circle_orders, gap_analysis
+from registry import content_key
+
+
+# Function to read an order book and run the gap analysis, timing the Excel read on its own.
+# Returns the gap analysis and every CBL/NCBL order, including those the gap analysis leaves out.
+def analyse_order_book(uploaded_file, mode):
+    with stage('read order book') as record:
+        orders = pd.read_excel(uploaded_file)
+        record['rows'] = len(orders)
+    return (*gap_analysis(orders, mode), circle_orders(orders))
+
+
+# Page 3: Upload and see the gap
+def render(registry, jobs):
+    st.image('logo_hil.jpg', width=100)
+    st.title("Circle plan & Gap identification")
+
+    uploaded_file = st.file_uploader("Upload Excel file", type=["xlsx"])
+
+    if uploaded_file is not None:
+        angle_mode = st.radio("Angle search", ["Grid (1.5° steps)", "Exact (30° to 60°)"], horizontal=True)
+        mode = 'exact' if angle_mode.startswith("Exact") else 'grid'
+
+        # The same order book uploaded by several planners is analysed once per server, in the background
+        key = content_key('gap_analysis', uploaded_file.getvalue(), mode)
+        analysis = compute_in_background(jobs, registry, key, lambda: analyse_order_book(uploaded_file, mode),
+                                         "Analysing the order book")
+        if analysis is None:
+            return
+        filtered_df, opportunity_percentage, circle_df = analysis
+
+        # Display Opportunity % Card
+        st.subheader("Opportunity Analysis")
+        st.metric(label="Opportunity %", value=f"{opportunity_percentage} %")
+
+        
+        st.write("Processed DataFrame:")
+        st.dataframe(filtered_df)
+        
+        # The download is only built when the button is clicked
+        export_format = st.radio("Download format", list(EXPORT_FORMATS), horizontal=True)
+        extension, mime = EXPORT_FORMATS[export_format]
+        st.download_button(
+            label="Download the File",
+            data=lambda: export_file(filtered_df, export_format),
+            file_name=f'recovery_analysis.{extension}',
+            mime=mime,
+        )
+
+        render_plan(circle_df, mode, export_format)
+
+
+# Width assignment plan: re-assigns hot-rolled widths to all CBL/NCBL orders within the available kg of each width
+def render_plan(circle_df, mode, export_format):
+    st.subheader("Width Assignment Plan")
+    st.caption("Capacity is the kg of hot-rolled input available per width; it starts at what the order book uses "
+               "today. Leave a capacity empty for no limit.")
+
+    current = circle_df.groupby('Hot Rolled(base)')['Input'].sum()
+    widths = sorted(set(W_VALUES) | set(current.index.dropna()))
+    catalogue = st.data_editor(
+        pd.DataFrame({"Width (mm)": widths, "Capacity (kg)": current.reindex(widths, fill_value=0).round(0).to_numpy()}),
+        num_rows="dynamic", key="width_capacities")
+
+    catalogue = catalogue.assign(**{
+        "Width (mm)": pd.to_numeric(catalogue["Width (mm)"], errors="coerce"),
+        "Capacity (kg)": pd.to_numeric(catalogue["Capacity (kg)"], errors="coerce"),
+    }).dropna(subset=["Width (mm)"]).drop_duplicates("Width (mm)")
+    if catalogue.empty:
+        st.error("Enter at least one coil width.")
+        return
+
+    plan, usage = assign_widths(circle_df, catalogue.set_index("Width (mm)")["Capacity (kg)"], mode)
+
+    actual_kg = plan['Current Kg'].sum()
+    planned_kg = plan['Planned Kg'].sum()
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Recovered Kg (order book)", f"{actual_kg:,.0f}")
+    col2.metric("Recovered Kg (plan)", f"{planned_kg:,.0f}", delta=f"{planned_kg - actual_kg:,.0f}")
+    col3.metric("Orders without a width", int(plan['Planned Width'].isna().sum()))
+
+    st.dataframe(usage, hide_index=True)
+    st.dataframe(plan)
+
+    extension, mime = EXPORT_FORMATS[export_format]
+    st.download_button("Download the Plan", lambda: export_file(plan, export_format),
+                       f"width_plan.{extension}", mime=mime)
@@ -0,0 +1,201 @@
+import pandas as pd
+import plotly.express as px
+import streamlit as st
+
+from charts import chart_data
+from jobs import wait_for
+from profiling import stage
+from registry import content_key
+from wip import ROLLING_DAYS, SPIKE_Z, WipStore, file_key, load_wip_sheets, parse_file_date, update_wip_store
+from wip_history import history_dates, history_labels, history_store, history_version, query_history, save_day
+
+
+# Function to parse the uploaded files in a background job that survives reruns, with per-file progress.
+# The parsed sheets land in the shared registry and the disk cache. Once the job is done, returns the
+# errors of the files that could not be parsed by file key; None while it runs.
+def load_in_background(uploaded_files, registry, jobs):
+    files = [(f, file_date) for f in uploaded_files if (file_date := parse_file_date(f.name))]
+    if not files:
+        return {}
+    key = content_key('wip_load', '|'.join(sorted(file_key(f.getvalue(), d) for f, d in files)).encode())
+
+    def load(progress):
+        results = load_wip_sheets(files, registry=registry, progress=progress)
+        return {file_key(f.getvalue(), d): error for f, d, df, error in results if error is not None}
+
+    job = jobs.submit(key, load, "Loading WIP files", total=len(files))
+    return wait_for(jobs, job)
+
+
+# Day columns live in a per-session WipStore; a rerun only loads the days whose files changed.
+# Parsed sheets come from the shared registry or the on-disk cache; new files are parsed in parallel worker processes.
+# Each day loaded is also saved to the WIP history, once per upload. Files the background load could not
+# parse are reported from its errors rather than parsed again.
+def process_files(uploaded_files, registry, failed=None):
+    store = st.session_state.setdefault('wip_store', WipStore())
+    for message in update_wip_store(store, uploaded_files, registry=registry, on_day=save_day, failed=failed):
+        st.error(message)
+
+    if not store.sources:
+        st.error("No valid files were uploaded.")
+        return None
+
+    return store
+
+
+# Stores built from the WIP history, shared by every session until a day is written
+@st.cache_resource(max_entries=8)
+def load_history_store(start, end, resources, invs, version):
+    with stage('WIP history query') as record:
+        rows = query_history(start, end, resources, invs)
+        record['rows'] = len(rows)
+    return history_store(rows) if len(rows) else None
+
+
+# Function to pick a date range, machine centers and inventories from the saved WIP history and load them
+def pick_history():
+    dates = history_dates()
+    if not dates:
+        st.info("No WIP history saved yet. Days are saved as WIP files are uploaded.")
+        return None
+
+    first_day, last_day = dates[0].date(), dates[-1].date()
+    picked = st.date_input('History dates', value=(first_day, last_day), min_value=first_day, max_value=last_day)
+    if len(picked) < 2:
+        return None
+    start_day, end_day = picked
+
+    version = history_version()
+    resource_options, inv_options = history_labels(start_day, end_day)
+    resources = st.multiselect('Machine centers to load (all when empty)', options=resource_options)
+    invs = st.multiselect('Inventories to load (all when empty)', options=inv_options)
+
+    store = load_history_store(start_day, end_day, tuple(resources), tuple(invs), version)
+    if store is None:
+        st.error("No WIP history found for the selected dates, Machine centers and Inventories.")
+    return store
+
+
+# Page 1: WIP Data Processor
+def render(registry, jobs):
+    st.image('logo_hil.jpg', width=100)
+    st.title('WIP Day-wise Trend')
+
+    # WIP comes from newly uploaded files or from the days already saved to the history
+    source = st.radio("WIP data from", ["Upload files", "Saved history"], horizontal=True)
+    store = None
+    if source == "Upload files":
+        # File uploader to upload multiple files
+        uploaded_files = st.file_uploader("📂Choose WIP Excel files", accept_multiple_files=True, type="xlsx")
+        failed = load_in_background(uploaded_files, registry, jobs) if uploaded_files else None
+        if failed is not None:
+            store = process_files(uploaded_files, registry, failed)
+    else:
+        store = pick_history()
+
+    if store is not None:
+        pivot_df = store.to_frame()
+
+        if pivot_df is not None:
+            st.dataframe(pivot_df.rename(columns=lambda c: c.strftime('%Y-%m-%d') if isinstance(c, pd.Timestamp) else c))
+
+            # Multiselect to select the resources and inventories to plot
+            resources_to_plot = st.multiselect('Select Machine centers to plot', options=pivot_df['Resources'].unique())
+            invs_to_plot = st.multiselect('Select inventories to plot', options=pivot_df['Inv'].unique())
+
+            # Rollup of the pivot built once per loaded set of days; a selection is an indexed sum
+            cube = store.cube()
+
+            # Date window of both charts; a narrower window is re-drawn from the daily values in full detail
+            first_day, last_day = cube.dates[0].date(), cube.dates[-1].date()
+            if first_day < last_day:
+                start_day, end_day = st.slider('Zoom to dates', min_value=first_day, max_value=last_day,
+                                               value=(first_day, last_day), format='YYYY-MM-DD')
+            else:
+                start_day, end_day = first_day, last_day
+
+            if resources_to_plot and invs_to_plot:
+                plot_data = cube.select(resources_to_plot, invs_to_plot)  # Sum across selected resources and inventories
+
+                if plot_data.empty:
+                    st.error(f"No data found for selected Machine centers and Inventories.")
+                else:
+                    # Long histories are downsampled to the chart width and drawn with WebGL
+                    plot_data, render_mode, markers = chart_data(plot_data, start_day, end_day)
+                    dates = plot_data.index
+                    values = plot_data.values
+
+                    # Use Plotly to create a colorful plot
+                    fig = px.line(
+                        x=dates,
+                        y=values,
+                        labels={'x': 'Date', 'y': 'WIP in MT'},
+                        title=f'WIP trend for selected inventories at {", ".join(resources_to_plot)}',
+                        markers=markers,
+                        render_mode=render_mode
+                    )
+
+                    # Customize the appearance
+                    fig.update_traces(line=dict(color='royalblue', width=4))
+                    fig.update_layout(
+                        xaxis_title='Date',
+                        yaxis_title='WIP in MT',
+                        title_font_size=24,
+                        title_x=0.3,  # Center title
+                        plot_bgcolor='rgba(0,0,0,0)',
+                        paper_bgcolor='rgba(0,0,0,0)',
+                        xaxis=dict(showgrid=True, gridcolor='LightPink'),
+                        yaxis=dict(showgrid=True, gridcolor='LightPink'),
+                    )
+
+                    with stage('render WIP trend chart') as record:
+                        record['rows'] = len(values)
+                        st.plotly_chart(fig)
+            
+            # New plot: Sum of Qty for all Inventories in the selected Resource
+            st.subheader(f'Total WIP Across Selected Machine centers and Inventories')
+
+            total_qty_data = cube.select(resources_to_plot)  # Sum across all inventories
+            total_qty_data, render_mode, markers = chart_data(total_qty_data, start_day, end_day)
+
+            # Adding the selected machine centers to the title
+            selected_resources_str = ", ".join(resources_to_plot)
+            fig2 = px.line(
+                x=total_qty_data.index,
+                y=total_qty_data.values,
+                labels={'x': 'Date', 'y': 'Total WIP (in MT)'},
+                title=f'Total WIP for {selected_resources_str}',
+                markers=markers,
+                render_mode=render_mode
+            )
+
+            fig2.update_traces(line=dict(color='orange', width=4))
+            fig2.update_layout(
+                xaxis_title='Date',
+                yaxis_title='Total WIP (in MT)',
+                title_font_size=24,
+                title_x=0.3,  # Center title
+                plot_bgcolor='rgba(0,0,0,0)',
+                paper_bgcolor='rgba(0,0,0,0)',
+                xaxis=dict(showgrid=True, gridcolor='LightPink'),
+                yaxis=dict(showgrid=True, gridcolor='LightPink'),
+            )
+
+            with stage('render total WIP chart') as record:
+                record['rows'] = len(total_qty_data)
+                st.plotly_chart(fig2)
+
+            # Series with abnormal build-up, flagged from rolling statistics computed once per loaded set of days
+            st.subheader('Abnormal WIP Build-up')
+            trends = store.trends()
+            if len(trends.dates) < 4:
+                st.info("At least 4 report days are needed to flag abnormal WIP build-up.")
+            else:
+                spike_day = st.selectbox('Report day', trends.dates[::-1], format_func=lambda d: d.strftime('%Y-%m-%d'))
+                z_threshold = st.slider('Spike threshold (z-score)', min_value=2.0, max_value=5.0, value=SPIKE_Z, step=0.5)
+                spikes = trends.spikes(spike_day, z_threshold)
+                st.caption(f"WIP that rose above the previous {ROLLING_DAYS} report days by {z_threshold} standard deviations or more")
+                if spikes.empty:
+                    st.success(f"No abnormal WIP build-up on {spike_day:%Y-%m-%d}.")
+                else:
+                    st.dataframe(spikes)
@@ -0,0 +1,98 @@
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+
+# Number of stage timings kept in memory for the admin panel
+PROFILE_MAX_RECORDS = int(os.environ.get('PROFILE_MAX_RECORDS', '500'))
+
+# Peak memory is traced only when enabled, since tracing slows every allocation down
+PROFILE_MEMORY = os.environ.get('PROFILE_MEMORY', '0') == '1'
+
+# Users who see the timings panel in the sidebar
+PROFILE_ADMINS = set(os.environ.get('PROFILE_ADMINS', 'anant.m').split(','))
+
+_records = deque(maxlen=PROFILE_MAX_RECORDS)
+_lock = threading.Lock()
+_local = threading.local()
+
+
+# Function to count the rows of a stage result: DataFrames, Series, arrays and lists, or the first of a tuple
+def count_rows(value):
+    if isinstance(value, tuple) and value:
+        value = value[0]
+    if isinstance(value, list) or hasattr(value, 'shape'):
+        return len(value)
+    return None
+
+
+# Function to time one pipeline stage. The yielded record can be given a row count ('rows') by the caller.
+# Records hold the wall time and, when PROFILE_MEMORY is on, the peak memory allocated during the stage
+# (traced over the whole process, so stages running at the same time in other sessions are included).
+@contextmanager
+def stage(name, page=None):
+    record = {'time': datetime.now().isoformat(timespec='seconds'), 'page': page or getattr(_local, 'page', None),
+              'stage': name, 'seconds': None, 'rows': None, 'peak_mb': None}
+    stack = _local.__dict__.setdefault('stack', [])
+    tracing = PROFILE_MEMORY and tracemalloc.is_tracing()
+    if tracing:
+        current, peak = tracemalloc.get_traced_memory()
+        if stack:
+            stack[-1][1] = max(stack[-1][1], peak)
+        tracemalloc.reset_peak()
+        stack.append([current, current])
+    start = time.perf_counter()
+    try:
+        yield record
+    finally:
+        record['seconds'] = round(time.perf_counter() - start, 4)
+        if tracing:
+            base, peak = stack.pop()
+            peak = max(peak, tracemalloc.get_traced_memory()[1])
+            if stack:
+                stack[-1][1] = max(stack[-1][1], peak)
+            record['peak_mb'] = round((peak - base) / 2**20, 2)
+        with _lock:
+            _records.append(record)
+
+
+# Decorator to time every call of a function as a stage, with rows counted from its result
+def timed(name):
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(name) as record:
+                result = func(*args, **kwargs)
+                record['rows'] = count_rows(result)
+            return result
+        return wrapper
+    return decorator
+
+
+# Function to tag the stages run by this thread with the page being rendered
+def set_page(page):
+    _local.page = page
+
+
+# Function to start tracing memory for peak measurements, when enabled
+def start_memory_tracing():
+    if PROFILE_MEMORY and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+
+# Function to get the recent stage timings, newest first
+def recent_timings(limit=None):
+    with _lock:
+        records = list(_records)[::-1]
+    return records[:limit] if limit else records
+
+
+# Function to export stage timings as JSON lines
+def timings_jsonl(records=None):
+    records = recent_timings() if records is None else records
+    return ''.join(json.dumps(record) + '\n' for record in records)
@@ -0,0 +1,383 @@
+import numpy as np
+import pandas as pd
+from functools import lru_cache
+from typing import NamedTuple
+
+from profiling import stage, timed
+
+# Possible discrete values for coil width w
+W_VALUES = [914, 965, 1016, 1067, 1118, 1270, 1320]
+
+# Share of a coil's input weight that reaches the circle line
+YIELD_FACTOR = 0.9
+
+# Angle values from 30 to 60 in steps of 1.5 degrees
+ANGLE_VALUES = np.arange(30, 60.1, 1.5)
+
+# Page 2 input space: disc diameter, disc to disc gap, disc to border gap
+PAGE2_DIAMETERS = np.arange(100, 1001, 10)
+PAGE2_DISC_GAPS = np.arange(5, 21)
+PAGE2_BORDER_GAPS = np.arange(20, 151)
+
+
+# Result of one broadcast recovery evaluation
+class RecoveryResult(NamedTuple):
+    diameters: np.ndarray
+    widths: np.ndarray
+    angles: np.ndarray
+    grid: np.ndarray             # (diameter, width, angle) -> % recovery, -inf where infeasible; None in exact mode
+    width_recovery: np.ndarray   # (diameter, width) -> best % recovery over angles
+    width_angle: np.ndarray      # (diameter, width) -> angle giving width_recovery
+    best_width: np.ndarray       # (diameter,) -> optimal coil width
+    best_angle: np.ndarray       # (diameter,) -> optimal angle
+    best_recovery: np.ndarray    # (diameter,) -> maximum % recovery
+
+
+# Function to compute % recovery from the blank count at a given angle
+def _percent_recovery(b, w, blank_center, angle_rad, no_of_blanks, t):
+    coil_pitch = blank_center * np.cos(angle_rad)
+    material_used = 2 * coil_pitch * w * t / 1000
+    blank_vol = (no_of_blanks * np.pi * b**2 * t) / 4000
+    percent_loss = (material_used - blank_vol) / material_used * 100
+    return 100 - percent_loss
+
+
+# Function to broadcast diameters, widths and per-diameter gaps to (diameter, width) arrays
+def _layout(diameters, widths, disc_to_border, disc_to_disc):
+    b = np.asarray(diameters, dtype=float).reshape(-1, 1)
+    w = np.asarray(widths, dtype=float).reshape(1, -1)
+    disc_to_border = np.broadcast_to(np.asarray(disc_to_border, dtype=float), b.shape[:1]).reshape(-1, 1)
+    disc_to_disc = np.broadcast_to(np.asarray(disc_to_disc, dtype=float), b.shape[:1]).reshape(-1, 1)
+    return b, w, b + disc_to_disc, w - 2 * disc_to_border
+
+
+# Function to compute % recovery for every diameter x width x angle in one call.
+# disc_to_border / disc_to_disc may be scalars or one value per diameter.
+def recovery_grid(diameters, widths, angles, disc_to_border=30, disc_to_disc=5, t=1):
+    b, w, blank_center, usable_width = (a[..., None] for a in _layout(diameters, widths, disc_to_border, disc_to_disc))
+    angle_rad = np.pi * np.asarray(angles, dtype=float).reshape(1, 1, -1) / 180
+    tool_pitch = blank_center * np.sin(angle_rad)
+
+    # Usable width must leave room for at least one blank
+    feasible = usable_width > b
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        no_of_blanks = np.floor((usable_width - b) / tool_pitch) + 1
+        percent_recovery = _percent_recovery(b, w, blank_center, angle_rad, no_of_blanks, t)
+
+    return np.where(feasible, percent_recovery, -np.inf)
+
+
+# Function to find the exact best angle in [angle_min, angle_max] for every diameter x width.
+# The blank count floor((usable_width - b) / tool_pitch) + 1 only steps down as the angle grows,
+# while recovery rises with the angle at a fixed count, so the optimum is the last angle before a
+# step (sin(angle) = (usable_width - b) / (k * blank_center), k + 1 blanks) or angle_max itself.
+# A breakpoint sits exactly where the count steps, so each one is floored to angle_step degrees (the
+# precision planners are shown) and the count is recomputed there with the recovery_grid formula.
+# Returns (recovery, angle in degrees), each of shape (diameter, width), -inf where infeasible.
+def exact_angle_recovery(diameters, widths, angle_min=30, angle_max=60, disc_to_border=30, disc_to_disc=5, t=1,
+                         angle_step=0.01):
+    b, w, blank_center, usable_width = _layout(diameters, widths, disc_to_border, disc_to_disc)
+    feasible = usable_width > b
+    sin_min = np.sin(np.pi * angle_min / 180)
+    sin_max = np.sin(np.pi * angle_max / 180)
+    pitches = np.where(feasible, (usable_width - b) / blank_center, 0)
+
+    # Breakpoints inside the angle range, padded to the largest count over all cells
+    k_lo = np.maximum(np.ceil(pitches / sin_max), 1)
+    k_hi = np.floor(pitches / sin_min)
+    n_k = int(max((k_hi - k_lo + 1).max(initial=0), 0))
+    k = k_lo[..., None] + np.arange(n_k)
+    on_range = (k <= k_hi[..., None]) & feasible[..., None]
+    angle_k = np.degrees(np.arcsin(np.clip(pitches[..., None] / k, sin_min, sin_max)))
+    angle_k = np.maximum(np.floor(angle_k / angle_step) * angle_step, angle_min)
+
+    angle_max_deg = np.full(b.shape[:1] + w.shape[1:] + (1,), float(angle_max))
+    angles = np.concatenate([angle_k, angle_max_deg], axis=-1)
+    angle_rad = np.pi * angles / 180
+
+    b, w, blank_center, usable_width = b[..., None], w[..., None], blank_center[..., None], usable_width[..., None]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        no_of_blanks = np.floor((usable_width - b) / (blank_center * np.sin(angle_rad))) + 1
+        candidates = _percent_recovery(b, w, blank_center, angle_rad, no_of_blanks, t)
+    candidates = np.where(np.concatenate([on_range, feasible[..., None]], axis=-1), candidates, -np.inf)
+
+    best = candidates.argmax(axis=-1)[..., None]
+    recovery = np.take_along_axis(candidates, best, axis=-1)[..., 0]
+    angle = np.take_along_axis(angles, best, axis=-1)[..., 0]
+    return recovery, angle
+
+
+# Function to pick the best width and angle per diameter.
+# mode='grid' evaluates every angle in angles; mode='exact' searches the continuous range
+# between the smallest and largest angle, in which case grid is None.
+def optimize_recovery(diameters, widths=W_VALUES, angles=ANGLE_VALUES, disc_to_border=30, disc_to_disc=5, t=1, mode='grid'):
+    diameters = np.atleast_1d(np.asarray(diameters))
+    widths = np.asarray(widths)
+    angles = np.asarray(angles)
+
+    if mode == 'exact':
+        grid = None
+        width_recovery, width_angle = exact_angle_recovery(
+            diameters, widths, angles.min(), angles.max(), disc_to_border, disc_to_disc, t)
+    elif mode == 'grid':
+        grid = recovery_grid(diameters, widths, angles, disc_to_border, disc_to_disc, t)
+        # argmax keeps the first maximum, matching the width-then-angle scan order
+        angle_idx = grid.argmax(axis=2)
+        width_recovery = np.take_along_axis(grid, angle_idx[..., None], axis=2)[..., 0]
+        width_angle = angles[angle_idx]
+    else:
+        raise ValueError(f"Unknown optimizer mode: {mode}")
+
+    width_idx = width_recovery.argmax(axis=1)
+    rows = np.arange(len(diameters))
+
+    return RecoveryResult(
+        diameters=diameters,
+        widths=widths,
+        angles=angles,
+        grid=grid,
+        width_recovery=width_recovery,
+        width_angle=width_angle,
+        best_width=widths[width_idx],
+        best_angle=width_angle[rows, width_idx],
+        best_recovery=width_recovery[rows, width_idx],
+    )
+
+
+# Function to gather optimal width, max recovery and actual recovery for many order rows at once.
+# Rows whose diameter or width is not on the grid get NaN, like an empty lookup.
+def lookup_recovery(result, diameters, widths):
+    diameters = np.asarray(diameters)
+    d_idx = pd.Index(result.diameters).get_indexer(diameters)
+    w_idx = pd.Index(result.widths).get_indexer(np.asarray(widths))
+    found = (d_idx >= 0) & (w_idx >= 0)
+
+    optimal_width = pd.Series(result.best_width).reindex(d_idx).to_numpy()
+    max_recovery = pd.Series(result.best_recovery).reindex(d_idx).to_numpy()
+    actual_recovery = np.full(len(diameters), np.nan)
+    actual_recovery[found] = result.width_recovery[d_idx[found], w_idx[found]]
+
+    return pd.DataFrame({
+        'Optimal Width': optimal_width,
+        'Max Recovery': max_recovery,
+        'Actual Recovery': actual_recovery,
+    })
+
+
+# Columns of a batch of Page 2 inputs, one row per case
+CASE_COLUMNS = ['Disc Diameter (mm)', 'Disc to Disc (mm)', 'Disc to Border (mm)']
+
+
+# Function to optimize many Page 2 cases against a coil-width catalogue in one vectorized pass.
+# cases has CASE_COLUMNS. Returns one row per case with the best width, angle and recovery, and the
+# (case, width) best-recovery matrix; NaN where no blank fits.
+@timed('batch recovery')
+def batch_recovery(cases, widths=W_VALUES, mode='grid'):
+    cases = cases[CASE_COLUMNS].reset_index(drop=True)
+    widths = np.unique(np.asarray(widths))
+    result = optimize_recovery(cases[CASE_COLUMNS[0]].to_numpy(), widths, ANGLE_VALUES,
+                               cases[CASE_COLUMNS[2]].to_numpy(), cases[CASE_COLUMNS[1]].to_numpy(), mode=mode)
+
+    feasible = np.isfinite(result.best_recovery)
+    summary = cases.assign(**{
+        'Optimal Width (mm)': np.where(feasible, result.best_width, np.nan),
+        'Angle (°)': np.where(feasible, result.best_angle, np.nan),
+        '% Recovery': np.where(feasible, result.best_recovery, np.nan),
+    })
+    matrix = pd.DataFrame(np.where(np.isfinite(result.width_recovery), result.width_recovery, np.nan), columns=widths)
+    return summary, matrix
+
+
+# Best recovery of each coil width for one set of Page 2 inputs
+class WidthRecovery(NamedTuple):
+    widths: np.ndarray
+    width_recovery: np.ndarray   # width -> best % recovery over angles
+    width_angle: np.ndarray      # width -> angle giving width_recovery
+    best_width: float
+    best_angle: float
+    best_recovery: float
+
+
+# Per-width results for every Page 2 input by optimizer mode, filled by precompute_recovery_space
+_spaces = {}
+
+
+# Function to evaluate the whole Page 2 input space once, in chunks of diameters
+def precompute_recovery_space(widths=W_VALUES, mode='grid', chunk_size=8192):
+    b, disc_to_disc, disc_to_border = (
+        a.ravel() for a in np.meshgrid(PAGE2_DIAMETERS, PAGE2_DISC_GAPS, PAGE2_BORDER_GAPS, indexing='ij')
+    )
+    width_recovery = np.empty((len(b), len(widths)))
+    width_angle = np.empty((len(b), len(widths)))
+    with stage(f'recovery sweep ({mode})') as record:
+        record['rows'] = len(b)
+        for start in range(0, len(b), chunk_size):
+            end = start + chunk_size
+            result = optimize_recovery(b[start:end], widths, ANGLE_VALUES, disc_to_border[start:end], disc_to_disc[start:end], mode=mode)
+            width_recovery[start:end] = result.width_recovery
+            width_angle[start:end] = result.width_angle
+
+    shape = (len(PAGE2_DIAMETERS), len(PAGE2_DISC_GAPS), len(PAGE2_BORDER_GAPS), len(widths))
+    _spaces[mode] = (tuple(widths), width_recovery.reshape(shape), width_angle.reshape(shape))
+    best_recovery.cache_clear()
+
+
+# Function to flatten the Page 2 input space into one row per (diameter, disc gap, border gap, width)
+def recovery_space_frame(mode='grid'):
+    if mode not in _spaces:
+        precompute_recovery_space(mode=mode)
+    widths, width_recovery, width_angle = _spaces[mode]
+    b, disc_to_disc, disc_to_border, w = (
+        a.ravel() for a in np.meshgrid(PAGE2_DIAMETERS, PAGE2_DISC_GAPS, PAGE2_BORDER_GAPS, widths, indexing='ij')
+    )
+    return pd.DataFrame({
+        'Disc Diameter (mm)': b,
+        'Disc to Disc (mm)': disc_to_disc,
+        'Disc to Border (mm)': disc_to_border,
+        'Width (mm)': w,
+        'Angle (°)': width_angle.ravel(),
+        '% Recovery': width_recovery.ravel(),
+    })
+
+
+# Function to get the position of value in a Page 2 input range, None when it is off the grid
+def _space_index(values, value):
+    i = int(np.searchsorted(values, value))
+    return i if i < len(values) and values[i] == value else None
+
+
+# Function to get the best width and angle for one set of Page 2 inputs.
+# Answers from the precomputed input space when available, otherwise evaluates the grid;
+# the most recent inputs are kept in a bounded LRU cache.
+@lru_cache(maxsize=512)
+def best_recovery(b, disc_to_disc, disc_to_border, widths=tuple(W_VALUES), mode='grid'):
+    width_recovery = width_angle = None
+    space = _spaces.get(mode)
+    if space is not None and space[0] == widths:
+        idx = (_space_index(PAGE2_DIAMETERS, b), _space_index(PAGE2_DISC_GAPS, disc_to_disc),
+               _space_index(PAGE2_BORDER_GAPS, disc_to_border))
+        if None not in idx:
+            width_recovery, width_angle = space[1][idx], space[2][idx]
+
+    if width_recovery is None:
+        result = optimize_recovery(b, widths, ANGLE_VALUES, disc_to_border, disc_to_disc, mode=mode)
+        width_recovery, width_angle = result.width_recovery[0], result.width_angle[0]
+
+    widths = np.asarray(widths)
+    best = width_recovery.argmax()
+    for array in (widths, width_recovery, width_angle):
+        array.flags.writeable = False
+    return WidthRecovery(widths, width_recovery, width_angle, widths[best], width_angle[best], width_recovery[best])
+
+
+# Function to keep the orders of the circle lines (CBL/NCBL) of an order book
+def circle_orders(df):
+    return df[df['Resources'].isin(['CBL', 'NCBL'])].reset_index(drop=True)
+
+
+# Function to run the Page 3 gap analysis on an order book: best vs actual recovery per CBL/NCBL order.
+# Returns the processed orders and the Opportunity % rounded to 2 decimals.
+@timed('gap analysis')
+def gap_analysis(df, mode='grid'):
+    filtered_df = circle_orders(df)
+
+    unique_diameters = filtered_df['Cicle diameter'].dropna().unique()
+    result = optimize_recovery(unique_diameters, W_VALUES, ANGLE_VALUES, disc_to_border=30, disc_to_disc=5, mode=mode)
+
+    # Gather optimal width, max recovery and actual recovery for every order row at once
+    recovery_lookup = lookup_recovery(result, filtered_df['Cicle diameter'], filtered_df['Hot Rolled(base)'])
+    filtered_df = pd.concat([filtered_df.reset_index(drop=True), recovery_lookup], axis=1)
+
+    filtered_df['Difference'] = filtered_df['Max Recovery'] - filtered_df['Actual Recovery']
+
+    # Calculate Loss in Kg
+    filtered_df['Loss in Kg'] = (filtered_df['Difference'] * filtered_df['Input'] * YIELD_FACTOR / 100)
+
+    # Remove rows where Loss in Kg has inf values
+    filtered_df = filtered_df[~filtered_df['Loss in Kg'].isin([np.inf, -np.inf])]
+
+    # Calculate Opportunity %
+    total_loss_kg = filtered_df['Loss in Kg'].sum()
+    total_input = filtered_df['Input'].sum()
+    opportunity_percentage = (total_loss_kg / total_input) * 100
+
+    # Round to 2 decimal places
+    return filtered_df, round(opportunity_percentage, 2)
+
+
+# Function to assign a hot-rolled width to every CBL/NCBL order so that the total recovered kg is as high as
+# the width capacities allow. capacities maps width -> kg of input available (NaN / inf for no limit).
+# Every order is scored against every width in one pass (Input x yield x best recovery over angles). The
+# greedy plan then places the orders with the most to lose first (largest gap to their next best width) on
+# their best width while its capacity lasts; orders that no longer fit on a width are placed again on the rest.
+# Returns the orders with their planned width and recovered kg (NaN where nothing fits) next to the kg recovered
+# on their current width (0 where nothing fits), and the use of each width.
+@timed('width assignment')
+def assign_widths(orders, capacities, mode='grid', yield_factor=YIELD_FACTOR):
+    widths = np.asarray(capacities.index, dtype=float)
+    remaining = capacities.to_numpy(dtype=float, na_value=np.inf).copy()
+    diameters = orders['Cicle diameter'].to_numpy(dtype=float)
+    inputs = orders['Input'].to_numpy(dtype=float)
+
+    current = pd.to_numeric(orders['Hot Rolled(base)'], errors='coerce').to_numpy(dtype=float)
+
+    # Recovery on the catalogue widths and on each order's current width, from one evaluation
+    all_widths = np.union1d(widths, current[~np.isnan(current)])
+    unique_diameters, d_idx = np.unique(diameters, return_inverse=True)
+    result = optimize_recovery(unique_diameters, all_widths, ANGLE_VALUES, disc_to_border=30, disc_to_disc=5, mode=mode)
+    recovery = result.width_recovery[d_idx][:, np.searchsorted(all_widths, widths)]
+    on_width = ~np.isnan(current)
+    current_recovery = np.full(len(orders), -np.inf)
+    current_recovery[on_width] = result.width_recovery[d_idx[on_width], np.searchsorted(all_widths, current[on_width])]
+    with np.errstate(invalid='ignore'):
+        score = np.where(np.isfinite(recovery) & (inputs[:, None] > 0), inputs[:, None] * yield_factor * recovery / 100, -np.inf)
+
+    assigned = np.full(len(orders), -1)
+    is_open = remaining > 0
+    pending = np.arange(len(orders))
+    while len(pending) and is_open.any():
+        open_score = np.where(is_open, score[pending], -np.inf)
+        best = open_score.argmax(axis=1)
+        best_score = open_score[np.arange(len(pending)), best]
+        fits = np.isfinite(best_score)
+        pending, open_score, best, best_score = pending[fits], open_score[fits], best[fits], best_score[fits]
+        if not len(pending):
+            break
+
+        second = np.sort(open_score, axis=1)[:, -2] if open_score.shape[1] > 1 else np.full(len(pending), -np.inf)
+        regret = best_score - second
+        order = np.lexsort((-best_score, -regret))
+        pending, best = pending[order], best[order]
+
+        placed = np.zeros(len(pending), dtype=bool)
+        for j in np.unique(best):
+            rows = np.flatnonzero(best == j)
+            fit = np.cumsum(inputs[pending[rows]]) <= remaining[j]
+            placed[rows[fit]] = True
+            remaining[j] -= inputs[pending[rows[fit]]].sum()
+            # Orders larger than what is left of the width can no longer go on it
+            too_big = rows[~fit][inputs[pending[rows[~fit]]] > remaining[j]]
+            score[pending[too_big], j] = -np.inf
+            is_open[j] = remaining[j] > 0
+        assigned[pending[placed]] = best[placed]
+        pending = pending[~placed]
+
+    done = assigned >= 0
+    rows = np.flatnonzero(done)
+    plan = orders.reset_index(drop=True).copy()
+    plan['Planned Width'] = np.where(done, widths[np.maximum(assigned, 0)], np.nan)
+    plan['Planned Recovery'] = np.nan
+    plan.loc[rows, 'Planned Recovery'] = recovery[rows, assigned[rows]]
+    plan['Planned Kg'] = np.nan
+    plan.loc[rows, 'Planned Kg'] = score[rows, assigned[rows]]
+    with np.errstate(invalid='ignore'):
+        plan['Current Kg'] = np.where(np.isfinite(current_recovery), inputs * yield_factor * current_recovery / 100, 0)
+
+    usage = pd.DataFrame({
+        'Width (mm)': widths,
+        'Capacity (kg)': capacities.to_numpy(dtype=float),
+        'Planned Input (kg)': np.bincount(assigned[done], weights=inputs[done], minlength=len(widths)),
+        'Orders': np.bincount(assigned[done], minlength=len(widths)),
+    })
+    return plan, usage
@@ -0,0 +1,112 @@
+import hashlib
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# Memory budget of the shared dataset registry
+REGISTRY_MAX_BYTES = int(os.environ.get('DATASET_REGISTRY_MAX_MB', '1024')) * 1024 * 1024
+
+
+# Function to build a registry key from a namespace, the uploaded content and any extra parameters
+def content_key(namespace, data, *params):
+    return ':'.join([namespace, hashlib.sha256(data).hexdigest(), *map(str, params)])
+
+
+# Function to estimate the memory held by a registered value
+def _nbytes(value):
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True, index=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(deep=True, index=True))
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (tuple, list)):
+        return sum(_nbytes(v) for v in value)
+    return sys.getsizeof(value)
+
+
+# Function to hand a session a view of a shared value that cannot change the registered copy.
+# Shallow frame copies are only protected by copy-on-write, the default from pandas 3 (pinned in requirements.txt).
+def _view(value):
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return value.copy(deep=False)
+    if isinstance(value, np.ndarray):
+        view = value.view()
+        view.flags.writeable = False
+        return view
+    if isinstance(value, tuple):
+        return tuple(_view(v) for v in value)
+    return value
+
+
+# Server-wide store of parsed and processed datasets keyed by upload content.
+# Entries are evicted least recently used first once the footprint exceeds max_bytes.
+class DatasetRegistry:
+    def __init__(self, max_bytes=REGISTRY_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()   # key -> (value, nbytes)
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return _view(entry[0])
+
+    def put(self, key, value):
+        nbytes = _nbytes(value)
+        with self._lock:
+            self._entries[key] = (value, nbytes)
+            self._entries.move_to_end(key)
+            self._evict()
+        return _view(value)
+
+    # Function to get a dataset, computing it once even when several sessions ask at the same time
+    def get_or_compute(self, key, compute):
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        try:
+            with key_lock:
+                value = self.get(key)
+                if value is None:
+                    value = self.put(key, compute())
+        finally:
+            with self._lock:
+                self._key_locks.pop(key, None)
+        return value
+
+    def _evict(self):
+        total = sum(nbytes for _, nbytes in self._entries.values())
+        while total > self.max_bytes and len(self._entries) > 1:
+            _, (_, nbytes) = self._entries.popitem(last=False)
+            total -= nbytes
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    # Function to report the registry footprint: entry count, bytes held and hit counts
+    def footprint(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': sum(nbytes for _, nbytes in self._entries.values()),
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
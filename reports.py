@@ -0,0 +1,152 @@
+import re
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from profiling import timed
+
+# Date layouts seen in ERP text dumps, tried in order on a sample of each date column
+DATE_FORMATS = [
+    '%d-%b-%Y %H:%M:%S', '%d-%b-%Y %H:%M', '%d-%b-%Y',
+    '%d-%b-%y %H:%M:%S', '%d-%b-%y %H:%M', '%d-%b-%y',
+    '%d-%m-%Y %H:%M:%S', '%d-%m-%Y %H:%M', '%d-%m-%Y',
+    '%d/%m/%Y %H:%M:%S', '%d/%m/%Y %H:%M', '%d/%m/%Y',
+    '%d.%m.%Y', '%Y-%m-%d %H:%M:%S', '%Y-%m-%d',
+]
+
+# Ageing buckets in days: 0-2, 2-5, 5-10 and over 10; a lot aged exactly on an edge falls in the lower bucket
+AGE_EDGES = [2, 5, 10]
+AGE_LABELS = ['0–2 days', '2–5 days', '5–10 days', '>10 days']
+
+# Header labels are separated by two or more spaces
+_HEADER_TOKEN = re.compile(r'\S+(?: \S+)*')
+
+
+# Function to read the text lines of a report dump, one line per cell in the first column
+@timed('read report lines')
+def read_report_lines(file):
+    df = pd.read_excel(file, header=None, usecols=[0], dtype=str)
+    return df[0].dropna().tolist()
+
+
+# Function to split fixed-width report lines into named text columns.
+# Column starts come from the labels on the header line; a start is moved left onto a blank
+# column when values (e.g. right-aligned numbers) begin before their label.
+@timed('split fixed-width lines')
+def parse_fixed_width(lines, header_row=0):
+    header = lines[header_row]
+    body = lines[header_row + 1:]
+    tokens = list(_HEADER_TOKEN.finditer(header))
+    names = [t.group() for t in tokens]
+
+    width = max(len(line) for line in lines[header_row:])
+    chars = np.array(body, dtype=f'<U{width}').view('<U1').reshape(len(body), width)
+    blank = ((chars == ' ') | (chars == '')).all(axis=0)
+
+    starts = [0]
+    for prev, token in zip(tokens, tokens[1:]):
+        start = token.start()
+        gap = np.flatnonzero(blank[prev.end():start + 1])
+        if len(gap) and not blank[start - 1]:
+            start = prev.end() + gap[-1]
+        starts.append(start)
+    ends = starts[1:] + [width]
+
+    columns = {}
+    for name, start, end in zip(names, starts, ends):
+        cells = np.ascontiguousarray(chars[:, start:end]).view(f'<U{end - start}').ravel()
+        columns[name] = np.char.strip(cells)
+    return pd.DataFrame(columns).replace('', np.nan)
+
+
+# Function to store repetitive text columns (items, statuses, locations) as categories
+def compact_text_columns(df, max_unique_ratio=0.5):
+    for col in df.columns:
+        if df[col].dtype.kind == 'O' and df[col].nunique() <= max_unique_ratio * len(df):
+            df[col] = df[col].astype('category')
+    return df
+
+
+# Function to parse a text date column with one explicit format picked from a sample of its values
+def parse_dates(values, formats=DATE_FORMATS, sample_size=50):
+    sample = values.dropna().head(sample_size)
+    best, best_count = None, 0
+    for fmt in formats:
+        count = pd.to_datetime(sample, format=fmt, errors='coerce').notna().sum()
+        if count > best_count:
+            best, best_count = fmt, count
+    if best is None:
+        return pd.to_datetime(values, errors='coerce', dayfirst=True)
+    return pd.to_datetime(values, format=best, errors='coerce')
+
+
+# Function to parse Pending to Pack report into typed columns
+def parse_pending_to_pack(file):
+    data_split = parse_fixed_width(read_report_lines(file), header_row=1)
+
+    # Rename columns for consistency
+    data_split.rename(columns={"Pack": "Quantity", "Ordr Status": "Date", "Line No": "Line_Date"}, inplace=True)
+
+    # Parse dates from "Date" and "Line_Date" columns
+    data_split["Date"] = parse_dates(data_split["Date"])
+    data_split["Line_Date"] = parse_dates(data_split["Line_Date"])
+
+    # Create a new "Date" column, prioritizing "Date" over "Line_Date"
+    data_split["Final_Date"] = data_split["Date"].combine_first(data_split["Line_Date"])
+
+    # Convert Quantity and Case Qty to numeric
+    data_split["Quantity"] = pd.to_numeric(data_split["Quantity"], errors="coerce")
+    data_split["Lot Qty"] = pd.to_numeric(data_split["Lot Qty"], errors="coerce")
+    return compact_text_columns(data_split)
+
+
+# Function to age parsed Pending to Pack lots against today
+def age_pending_to_pack(data_split):
+    # Calculate "Number of Days" based on "Final_Date"
+    today = datetime.today()
+    data_split = data_split.copy(deep=False)
+    data_split["Number of Days"] = ((today - data_split["Final_Date"]) / pd.Timedelta(days=1)).round(1)
+
+    # Filter data where "Number of Days" > 2
+    filtered_data = data_split[data_split["Number of Days"] > 1.8].reset_index(drop=True)
+
+    # Return filtered data and sum of "Case Qty"
+    return filtered_data, filtered_data["Lot Qty"].sum()
+
+
+# Function to parse RTFG report into typed columns
+def parse_rtf_report(file):
+    data_split = parse_fixed_width(read_report_lines(file), header_row=2)
+
+    for col in ["Creation Date", "Parent Lot Origin"]:
+        data_split[col] = parse_dates(data_split[col])
+
+    data_split["Creation Date"] = data_split["Creation Date"].combine_first(data_split["Parent Lot Origin"])
+    data_split.rename(columns={"Pieces": "Quantity"}, inplace=True)
+    data_split["Quantity"] = pd.to_numeric(data_split["Quantity"], errors="coerce")
+    return compact_text_columns(data_split)
+
+
+# Function to age parsed RTFG lots against today
+def age_rtf_report(data_split):
+    today = datetime.today()
+    data_split = data_split.copy(deep=False)
+    data_split["Number of Days"] = ((today - data_split["Creation Date"]) / pd.Timedelta(days=1)).round(1)
+
+    filtered_data = data_split[data_split["Number of Days"] > 1.8].reset_index(drop=True)
+    return filtered_data, filtered_data["Quantity"].sum()
+
+
+# Function to count the lots and sum the quantity of a report per ageing bucket; lots without a date are left out
+def ageing_buckets(data_split, date_col, qty_col, today=None):
+    today = today or datetime.today()
+    days = ((today - data_split[date_col]) / pd.Timedelta(days=1)).round(1).to_numpy()
+    dated = ~np.isnan(days)
+    bucket = np.searchsorted(AGE_EDGES, days[dated], side='left')
+    quantity = pd.to_numeric(data_split[qty_col], errors='coerce').fillna(0).to_numpy()[dated]
+    return pd.DataFrame({
+        'Bucket': AGE_LABELS,
+        'Lots': np.bincount(bucket, minlength=len(AGE_LABELS)),
+        'Quantity': np.bincount(bucket, weights=quantity, minlength=len(AGE_LABELS)),
+    })
@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+
+from recovery import (PAGE2_BORDER_GAPS, PAGE2_DIAMETERS, PAGE2_DISC_GAPS, W_VALUES, exact_angle_recovery,
+                      optimize_recovery, recovery_grid)
+
+GAPS = [(border, disc) for border in (PAGE2_BORDER_GAPS[0], PAGE2_BORDER_GAPS[-1])
+        for disc in (PAGE2_DISC_GAPS[0], PAGE2_DISC_GAPS[-1])]
+
+
+@pytest.mark.parametrize('disc_to_border, disc_to_disc', GAPS)
+def test_exact_recovery_is_reached_at_reported_angle(disc_to_border, disc_to_disc):
+    recovery, angle = exact_angle_recovery(PAGE2_DIAMETERS, W_VALUES, 30, 60, disc_to_border, disc_to_disc)
+    for i, diameter in enumerate(PAGE2_DIAMETERS):
+        for j, width in enumerate(W_VALUES):
+            # Planners are shown the angle to 2 decimals
+            shown = round(angle[i, j], 2)
+            reached = recovery_grid(diameter, width, [shown], disc_to_border, disc_to_disc)[0, 0, 0]
+            assert reached == pytest.approx(recovery[i, j]), (diameter, width, shown)
+
+
+def test_exact_breakpoint_regression():
+    recovery, angle = exact_angle_recovery([140], [1320])
+    assert recovery_grid(140, 1320, [round(angle[0, 0], 2)])[0, 0, 0] == pytest.approx(recovery[0, 0])
+
+
+@pytest.mark.parametrize('disc_to_border, disc_to_disc', GAPS)
+def test_exact_is_never_below_grid(disc_to_border, disc_to_disc):
+    kwargs = dict(disc_to_border=disc_to_border, disc_to_disc=disc_to_disc)
+    grid = optimize_recovery(PAGE2_DIAMETERS, mode='grid', **kwargs).width_recovery
+    exact = optimize_recovery(PAGE2_DIAMETERS, mode='exact', **kwargs).width_recovery
+    feasible = np.isfinite(grid)
+    assert (np.isfinite(exact) == feasible).all()
+    assert (exact[feasible] >= grid[feasible] - 1e-9).all()
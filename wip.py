@@ -0,0 +1,454 @@
+import hashlib
+import multiprocessing as mp
+import os
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from exports import replace_parquet
+from profiling import stage, timed
+from xlsx_reader import read_sheet_columns
+
+# Daily WIP exports are named Alloy_Product_Wise_Summery__RK_ddmmyy
+FILE_PATTERN = r'Alloy_Product_Wise_Summery__RK_(\d{2})(\d{2})(\d{2})'
+
+# Local cache of parsed FNDWRR sheets, one Parquet file per upload
+CACHE_DIR = os.environ.get('WIP_CACHE_DIR', '.wip_cache')
+CACHE_MAX_BYTES = int(os.environ.get('WIP_CACHE_MAX_MB', '512')) * 1024 * 1024
+
+# Bumped whenever read_wip_sheet changes its output, so older cache entries are not reused
+SHEET_FORMAT = 2
+
+# Trailing report days behind the rolling means and spike z-scores, and the z-score that flags a spike
+ROLLING_DAYS = 7
+SPIKE_Z = 3.0
+
+# Smallest spread a window is scored against: 1 MT, or 5% of the window mean when that is larger,
+# so a rise from a flat or empty window is scored by its size instead of dividing by a zero spread
+SPIKE_MIN_STD_MT = 1.0
+SPIKE_MIN_STD_SHARE = 0.05
+
+# Number of processes used to parse uploaded workbooks
+WIP_WORKERS = int(os.environ.get('WIP_WORKERS', os.cpu_count() or 1))
+
+
+# Function to get the report date from a WIP file name, None if it does not match
+def parse_file_date(file_name):
+    match = re.search(FILE_PATTERN, file_name)
+    if not match:
+        return None
+    day, month, year = match.groups()
+    return datetime.strptime(f'{day}{month}{year}', '%d%m%y')
+
+
+# Function to parse one FNDWRR sheet into Resources / Inv / Qty / Date rows
+def read_wip_sheet(data, file_date):
+    columns = read_sheet_columns(data, 'FNDWRR', ['Resources', 'Inv', 'Qty'])
+    df = pd.DataFrame(columns).infer_objects()
+    df['Resources'] = df['Resources'].ffill()
+    df['Qty'] = pd.to_numeric(df['Qty'], errors='coerce')
+    df = df.dropna(subset=['Resources', 'Inv', 'Qty']).reset_index(drop=True)
+
+    # Labels repeat on every row, so they are kept as categories; mixed text / number labels become text
+    for col in ['Resources', 'Inv']:
+        if df[col].dtype == object:
+            df[col] = df[col].astype(str)
+        df[col] = df[col].astype('category')
+
+    df['Qty'] = df['Qty'].astype('float32')
+    df['Date'] = pd.Timestamp(file_date)
+    return df
+
+
+# Function to drop the least recently used cache files until the cache fits in max_bytes
+def evict_cache(cache_dir=CACHE_DIR, max_bytes=CACHE_MAX_BYTES):
+    entries = []
+    for entry in os.scandir(cache_dir):
+        if entry.name.endswith('.parquet'):
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+
+
+# Function to build the cache key of one upload from its content and report date
+def file_key(data, file_date):
+    return f"{hashlib.sha256(data).hexdigest()}_{file_date.strftime('%Y%m%d')}_v{SHEET_FORMAT}"
+
+
+# Function to read a cached sheet, None on a miss. A hit refreshes the entry's mtime for LRU eviction.
+def read_cached_sheet(key, cache_dir=CACHE_DIR):
+    path = os.path.join(cache_dir, f'{key}.parquet')
+    if not os.path.exists(path):
+        return None
+    try:
+        df = pd.read_parquet(path)
+        os.utime(path)
+        return df
+    except (OSError, ValueError):
+        return None
+
+
+# Function to parse one workbook and store the result in the cache
+def parse_and_cache(data, file_date, key, cache_dir=CACHE_DIR, max_bytes=CACHE_MAX_BYTES):
+    df = read_wip_sheet(data, file_date)
+
+    replace_parquet(df, os.path.join(cache_dir, f'{key}.parquet'))
+    evict_cache(cache_dir, max_bytes)
+    return df
+
+
+# Worker pool shared by every rerun, created on first use
+_pool = None
+_pool_workers = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool(workers):
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            _shutdown_pool()
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context('spawn'))
+            _pool_workers = workers
+        return _pool
+
+
+def _shutdown_pool():
+    global _pool, _pool_workers
+    if _pool is not None:
+        _pool.shutdown(wait=False)
+    _pool = None
+    _pool_workers = None
+
+
+# Function to keep a parsed sheet in the shared dataset registry, when one is used
+def _register(registry, key, df):
+    return registry.put(f'wip:{key}', df) if registry is not None else df
+
+
+# Function to load many uploads at once. Sheets already in the shared registry or the disk cache
+# are read here; misses are parsed in a process pool. progress(done, total) is called as files finish.
+# Returns (uploaded_file, file_date, df, error) in date order, with df None and error set for files that failed.
+@timed('load WIP sheets')
+def load_wip_sheets(files, workers=WIP_WORKERS, cache_dir=CACHE_DIR, max_bytes=CACHE_MAX_BYTES, registry=None,
+                    progress=None):
+    files = sorted(files, key=lambda x: x[1])
+    results = [None] * len(files)
+    misses = []
+    progress = progress or (lambda done, total: None)
+
+    for i, (uploaded_file, file_date) in enumerate(files):
+        data = uploaded_file.getvalue()
+        key = file_key(data, file_date)
+        df = registry.get(f'wip:{key}') if registry is not None else None
+        if df is None:
+            df = read_cached_sheet(key, cache_dir)
+            if df is not None:
+                df = _register(registry, key, df)
+        if df is not None:
+            results[i] = (uploaded_file, file_date, df, None)
+        else:
+            misses.append((i, data, key))
+    done = len(files) - len(misses)
+    progress(done, len(files))
+
+    if workers > 1 and len(misses) > 1:
+        pool = _get_pool(workers)
+        futures = {
+            pool.submit(parse_and_cache, data, files[i][1], key, cache_dir, max_bytes): (i, key)
+            for i, data, key in misses
+        }
+        for future in as_completed(futures):
+            i, key = futures[future]
+            try:
+                results[i] = (*files[i], _register(registry, key, future.result()), None)
+            except BrokenProcessPool as e:
+                _shutdown_pool()
+                results[i] = (*files[i], None, e)
+            except Exception as e:
+                results[i] = (*files[i], None, e)
+            done += 1
+            progress(done, len(files))
+    else:
+        for i, data, key in misses:
+            try:
+                df = parse_and_cache(data, files[i][1], key, cache_dir, max_bytes)
+                results[i] = (*files[i], _register(registry, key, df), None)
+            except Exception as e:
+                results[i] = (*files[i], None, e)
+            done += 1
+            progress(done, len(files))
+
+    return results
+
+
+# (Resources, Inv) x Date WIP matrix that is updated one day at a time.
+# Rows and day columns keep their position once allocated; cells never reported hold NaN.
+class WipStore:
+    def __init__(self):
+        self.rows = {}      # (Resources, Inv) -> row position
+        self.days = {}      # report date -> column position
+        self.sources = {}   # report date -> file key the column was built from
+        self.values = np.full((0, 0), np.nan, dtype='float32')
+        self._frame = None
+        self._cube = None
+        self._trends = None
+
+    # Function to grow the matrix capacity so that it holds n_rows x n_cols cells
+    def _reserve(self, n_rows, n_cols):
+        cap_rows, cap_cols = self.values.shape
+        if n_rows <= cap_rows and n_cols <= cap_cols:
+            return
+        grown = np.full((max(n_rows, 2 * cap_rows), max(n_cols, 2 * cap_cols)), np.nan, dtype='float32')
+        grown[:cap_rows, :cap_cols] = self.values
+        self.values = grown
+
+    # Function to add or replace the column of one report day from its parsed sheet
+    def set_day(self, file_date, df, key=None):
+        # Summed in float64, stored in float32
+        day_qty = df['Qty'].astype('float64').groupby([df['Resources'], df['Inv']], observed=True).sum() / 1000
+
+        for row_key in day_qty.index:
+            if row_key not in self.rows:
+                self.rows[row_key] = len(self.rows)
+        col = self.days.setdefault(file_date, len(self.days))
+        self._reserve(len(self.rows), len(self.days))
+
+        self.values[:, col] = np.nan
+        self.values[[self.rows[k] for k in day_qty.index], col] = day_qty.to_numpy()
+        self.sources[file_date] = key
+        self._frame = None
+        self._cube = None
+        self._trends = None
+
+    # Function to add or replace many report days at once from Resources / Inv / Date / Qty rows
+    def set_days(self, df, key=None):
+        qty = df['Qty'].astype('float64').groupby([df['Resources'], df['Inv'], df['Date']], observed=True).sum() / 1000
+        labels = qty.index.droplevel('Date')
+        dates = qty.index.get_level_values('Date')
+
+        row_keys = labels.unique()
+        for row_key in row_keys:
+            if row_key not in self.rows:
+                self.rows[row_key] = len(self.rows)
+        day_keys = dates.unique().sort_values()
+        cols = np.array([self.days.setdefault(d, len(self.days)) for d in day_keys], dtype='int64')
+        self._reserve(len(self.rows), len(self.days))
+
+        self.values[:, cols] = np.nan
+        row_pos = np.array([self.rows[k] for k in row_keys], dtype='int64')[row_keys.get_indexer(labels)]
+        self.values[row_pos, cols[day_keys.get_indexer(dates)]] = qty.to_numpy()
+        for d in day_keys:
+            self.sources[d] = key
+        self._frame = None
+        self._cube = None
+        self._trends = None
+
+    # Function to clear the column of a report day that is no longer loaded
+    def remove_day(self, file_date):
+        col = self.days.get(file_date)
+        if col is None:
+            return
+        self.values[:, col] = np.nan
+        del self.sources[file_date]
+        self._frame = None
+        self._cube = None
+        self._trends = None
+
+    # Function to render the loaded days as the Page 1 pivot: one row per (Resources, Inv) as categories,
+    # one float32 column per calendar day (a DatetimeIndex) between the first and last report,
+    # zeros where nothing was reported
+    def to_frame(self):
+        if self._frame is not None:
+            return self._frame
+
+        loaded = sorted(self.sources)
+        if not loaded:
+            return None
+
+        with stage('WIP pivot') as record:
+            all_dates = pd.date_range(start=loaded[0], end=loaded[-1])
+            n_rows = len(self.rows)
+            cols = [self.days[d] for d in loaded]
+            positions = [(d - loaded[0]).days for d in loaded]
+
+            block = self.values[:n_rows][:, cols]
+            present = ~np.isnan(block).all(axis=1)
+            matrix = np.zeros((int(present.sum()), len(all_dates)), dtype='float32')
+            matrix[:, positions] = np.nan_to_num(block[present])
+
+            index = pd.MultiIndex.from_tuples(list(self.rows), names=['Resources', 'Inv'])[present]
+            pivot_df = pd.DataFrame(matrix, index=index, columns=all_dates).sort_index().reset_index()
+            pivot_df['Resources'] = pivot_df['Resources'].astype('category')
+            pivot_df['Inv'] = pivot_df['Inv'].astype('category')
+            record['rows'] = len(pivot_df)
+        self._frame = pivot_df
+        return self._frame
+
+    # Function to get the rollup cube of the Page 1 pivot, built once per loaded set of days
+    def cube(self):
+        if self._cube is None:
+            pivot_df = self.to_frame()
+            if pivot_df is not None:
+                with stage('WIP rollup cube') as record:
+                    self._cube = WipCube(pivot_df)
+                    record['rows'] = len(pivot_df)
+        return self._cube
+
+    # Function to get the rolling statistics of every Page 1 series over the loaded report days,
+    # built once per loaded set of days
+    def trends(self):
+        if self._trends is None:
+            pivot_df = self.to_frame()
+            if pivot_df is not None:
+                with stage('WIP rolling statistics') as record:
+                    self._trends = WipTrends(pivot_df, sorted(self.sources))
+                    record['rows'] = len(pivot_df)
+        return self._trends
+
+
+# Rollup of the Page 1 pivot for the trend charts: a Resources x Inv x Date array indexed by category code,
+# with per-resource and per-inventory totals, so any selection is a sum over a few small slices.
+class WipCube:
+    def __init__(self, pivot_df):
+        self.dates = pd.DatetimeIndex(pivot_df.columns[2:])
+        resources = pivot_df['Resources'].cat
+        invs = pivot_df['Inv'].cat
+        self.resource_codes = {name: i for i, name in enumerate(resources.categories)}
+        self.inv_codes = {name: i for i, name in enumerate(invs.categories)}
+
+        self.values = np.zeros((len(self.resource_codes), len(self.inv_codes), len(self.dates)))
+        self.values[resources.codes, invs.codes] = pivot_df.iloc[:, 2:].to_numpy(dtype='float64')
+        self.resource_totals = self.values.sum(axis=1)
+        self.inv_totals = self.values.sum(axis=0)
+
+    # Function to sum the WIP of the selected machine centers and inventories per day; None selects all
+    def select(self, resource_names=None, inv_names=None):
+        r = [self.resource_codes[n] for n in resource_names if n in self.resource_codes] if resource_names is not None else None
+        i = [self.inv_codes[n] for n in inv_names if n in self.inv_codes] if inv_names is not None else None
+        if i is None:
+            totals = self.resource_totals if r is None else self.resource_totals[r]
+        elif r is None:
+            totals = self.inv_totals[i]
+        else:
+            totals = self.values[np.ix_(r, i)].reshape(-1, len(self.dates))
+        return pd.Series(totals.sum(axis=0), index=self.dates)
+
+
+# Rolling statistics of every (Resources, Inv) row of the Page 1 pivot over its report days, computed for the whole
+# matrix at once from running sums. A day's z-score compares its WIP with the mean and spread of the window days before it.
+class WipTrends:
+    def __init__(self, pivot_df, report_days, window=ROLLING_DAYS):
+        self.window = window
+        self.labels = pivot_df[['Resources', 'Inv']]
+        self.dates = pd.DatetimeIndex(report_days)
+        values = pivot_df[self.dates].to_numpy(dtype='float64')
+        n_rows, n_days = values.shape
+
+        sums = np.zeros((n_rows, n_days + 1))
+        squares = np.zeros((n_rows, n_days + 1))
+        np.cumsum(values, axis=1, out=sums[:, 1:])
+        np.cumsum(values ** 2, axis=1, out=squares[:, 1:])
+        days = np.arange(n_days)
+
+        # Mean of the window ending on each day
+        start = np.maximum(days + 1 - window, 0)
+        self.rolling_mean = (sums[:, days + 1] - sums[:, start]) / (days + 1 - start)
+
+        # Change from the report day before
+        self.delta = np.full((n_rows, n_days), np.nan)
+        self.delta[:, 1:] = np.diff(values, axis=1)
+
+        # z-score against the window before each day, with the spread floored; undefined with fewer than 3 earlier days
+        start = np.maximum(days - window, 0)
+        count = days - start
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean = (sums[:, days] - sums[:, start]) / count
+            std = np.sqrt(np.maximum((squares[:, days] - squares[:, start]) / count - mean ** 2, 0))
+            std = np.maximum(std, np.maximum(SPIKE_MIN_STD_MT, SPIKE_MIN_STD_SHARE * np.abs(mean)))
+            self.zscore = (values - mean) / std
+        self.zscore[:, count < 3] = np.nan
+        self.values = values
+
+    # Function to list the series whose WIP built up abnormally on a report day (the last one by default),
+    # largest z-score first
+    def spikes(self, day=None, z_threshold=SPIKE_Z):
+        col = -1 if day is None else self.dates.get_loc(pd.Timestamp(day))
+        z = self.zscore[:, col]
+        flagged = np.flatnonzero((z >= z_threshold) & (self.delta[:, col] > 0))
+        result = self.labels.iloc[flagged].assign(**{
+            'WIP (MT)': self.values[flagged, col],
+            f'{self.window}-day mean (MT)': self.rolling_mean[flagged, col],
+            'Day change (MT)': self.delta[flagged, col],
+            'z-score': z[flagged],
+        })
+        return result.sort_values('z-score', ascending=False).reset_index(drop=True)
+
+
+# Function to bring a WipStore in line with a set of uploaded files: days that are new or whose files
+# changed are loaded, days no longer uploaded are removed. on_day(file_date, df, key) is called for each day loaded.
+# failed maps the file keys of uploads that already failed to load to their error; they are not loaded again.
+# Returns one message per file that could not be used.
+def update_wip_store(store, files, workers=WIP_WORKERS, registry=None, on_day=None, failed=None):
+    failed = failed or {}
+    messages = []
+    files_by_date = {}
+    for f in files:
+        file_date = parse_file_date(f.name)
+        if file_date:
+            files_by_date.setdefault(file_date, []).append(f)
+        else:
+            messages.append(f"Filename does not match the expected pattern: {f.name}")
+
+    for file_date in set(store.sources) - set(files_by_date):
+        store.remove_day(file_date)
+
+    file_keys = {d: [file_key(f.getvalue(), d) for f in day_files] for d, day_files in files_by_date.items()}
+    changed = {}
+    for file_date in sorted(files_by_date):
+        key = '|'.join(file_keys[file_date])
+        if store.sources.get(file_date) != key:
+            changed[file_date] = key
+
+    to_load = []
+    for file_date in changed:
+        for f, key in zip(files_by_date[file_date], file_keys[file_date]):
+            if key in failed:
+                messages.append(f"Error reading {f.name}: {failed[key]}")
+            else:
+                to_load.append((f, file_date))
+    results = load_wip_sheets(to_load, workers, registry=registry)
+
+    day_frames = {file_date: [] for file_date in changed}
+    for f, file_date, df, error in results:
+        if error is not None:
+            messages.append(f"Error reading {f.name}: {error}")
+        else:
+            day_frames[file_date].append(df)
+
+    for file_date, df_list in day_frames.items():
+        if df_list:
+            day_df = pd.concat(df_list, ignore_index=True)
+            store.set_day(file_date, day_df, changed[file_date])
+            if on_day is not None:
+                on_day(file_date, day_df, changed[file_date])
+        else:
+            store.remove_day(file_date)
+    return messages
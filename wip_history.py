@@ -0,0 +1,96 @@
+import os
+import threading
+
+import pandas as pd
+
+from exports import replace_parquet
+from wip import WipStore
+
+# Local store of processed WIP days: one Parquet file per report day under a month=YYYY-MM partition
+WIP_HISTORY_DIR = os.environ.get('WIP_HISTORY_DIR', '.wip_history')
+
+HISTORY_COLUMNS = ['Resources', 'Inv', 'Date', 'Qty', 'Source']
+
+# Days are written one at a time by this server; other processes never see a partial file
+_lock = threading.Lock()
+
+
+# Function to get the path of one report day's file
+def _day_path(file_date, history_dir=WIP_HISTORY_DIR):
+    return os.path.join(history_dir, f'month={file_date:%Y-%m}', f'{file_date:%Y-%m-%d}.parquet')
+
+
+# Function to list the report days held in the history, in date order, from the file names alone
+def history_dates(history_dir=WIP_HISTORY_DIR):
+    if not os.path.isdir(history_dir):
+        return []
+    dates = []
+    for month in os.scandir(history_dir):
+        if month.is_dir() and month.name.startswith('month='):
+            dates += [pd.Timestamp(entry.name[:-len('.parquet')]) for entry in os.scandir(month.path)
+                      if entry.name.endswith('.parquet')]
+    return sorted(dates)
+
+
+# Function to get a version of the history that changes whenever a day is written
+def history_version(history_dir=WIP_HISTORY_DIR):
+    if not os.path.isdir(history_dir):
+        return ()
+    return tuple(sorted((month.name, month.stat().st_mtime_ns) for month in os.scandir(history_dir) if month.is_dir()))
+
+
+# Function to store the WIP of one report day, summed per (Resources, Inv), replacing an earlier copy of the day.
+# Nothing is written when the day is already held from the same upload.
+def save_day(file_date, df, source, history_dir=WIP_HISTORY_DIR):
+    file_date = pd.Timestamp(file_date)
+    with _lock:
+        path = _day_path(file_date, history_dir)
+        if os.path.exists(path) and (pd.read_parquet(path, columns=['Source'])['Source'] == source).all():
+            return False
+
+        day = df['Qty'].astype('float64').groupby([df['Resources'], df['Inv']], observed=True).sum().reset_index()
+        day['Resources'] = day['Resources'].astype('category')
+        day['Inv'] = day['Inv'].astype('category')
+        day['Qty'] = day['Qty'].astype('float32')
+        day['Date'] = file_date
+        day['Source'] = source
+
+        replace_parquet(day[HISTORY_COLUMNS], path)
+        return True
+
+
+# Function to build the read filters of a query: month partitions first, so only the needed
+# directories are opened, then the report days and labels
+def _filters(start, end, resources=None, invs=None):
+    start, end = pd.Timestamp(start), pd.Timestamp(end)
+    months = [m.strftime('%Y-%m') for m in pd.period_range(start, end, freq='M')]
+    filters = [('month', 'in', months), ('Date', '>=', start), ('Date', '<=', end)]
+    if resources:
+        filters.append(('Resources', 'in', list(resources)))
+    if invs:
+        filters.append(('Inv', 'in', list(invs)))
+    return filters
+
+
+# Function to list the machine centers and inventories reported between start and end
+def history_labels(start, end, history_dir=WIP_HISTORY_DIR):
+    if not history_dates(history_dir):
+        return [], []
+    labels = pd.read_parquet(history_dir, columns=['Resources', 'Inv'], filters=_filters(start, end))
+    return sorted(labels['Resources'].unique()), sorted(labels['Inv'].unique())
+
+
+# Function to read the stored WIP rows between start and end, limited to the given machine centers and
+# inventories (all when empty). Only the month partitions in range and the columns used are read.
+def query_history(start, end, resources=None, invs=None, history_dir=WIP_HISTORY_DIR):
+    if not history_dates(history_dir):
+        return pd.DataFrame(columns=HISTORY_COLUMNS[:-1])
+    return pd.read_parquet(history_dir, columns=HISTORY_COLUMNS[:-1],
+                           filters=_filters(start, end, resources, invs))
+
+
+# Function to load queried history rows into a WipStore, one day column per report day
+def history_store(rows):
+    store = WipStore()
+    store.set_days(rows)
+    return store
@@ -0,0 +1,169 @@
+import io
+import posixpath
+import re
+import zipfile
+import xml.etree.ElementTree as ET
+from html import unescape
+
+import numpy as np
+
+# Cell strings that pd.read_excel turns into NaN by default
+NA_STRINGS = {
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+    '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null',
+}
+
+# Worksheet XML patterns; {cols} is filled with the column letters being read
+_CELL = rb'<(?:\w+:)?c\s([^>]*?)\br="({cols})(\d+)"([^>]*?)(?:/>|>(.*?)</(?:\w+:)?c>)'
+_CELL_TYPE = re.compile(rb'\bt="(\w+)"')
+_VALUE = re.compile(rb'<(?:\w+:)?v>(.*?)</(?:\w+:)?v>', re.S)
+_INLINE_TEXT = re.compile(rb'<(?:\w+:)?t(?:\s[^>]*)?>(.*?)</(?:\w+:)?t>', re.S)
+
+
+# Function to strip the XML namespace from a tag, so transitional and strict workbooks both parse
+def _local(tag):
+    return tag.rsplit('}', 1)[-1]
+
+
+# Function to find the worksheet part of a sheet by its name
+def _sheet_path(zf, sheet_name):
+    workbook = ET.fromstring(zf.read('xl/workbook.xml'))
+    rel_id = None
+    for el in workbook.iter():
+        if _local(el.tag) == 'sheet' and el.get('name') == sheet_name:
+            rel_id = next(v for k, v in el.attrib.items() if _local(k) == 'id')
+            break
+    if rel_id is None:
+        raise ValueError(f"Worksheet named '{sheet_name}' not found")
+
+    rels = ET.fromstring(zf.read('xl/_rels/workbook.xml.rels'))
+    for el in rels:
+        if el.get('Id') == rel_id:
+            target = el.get('Target')
+            if target.startswith('/'):
+                return target.lstrip('/')
+            return posixpath.normpath(posixpath.join('xl', target))
+    raise ValueError(f"Worksheet named '{sheet_name}' has no part in the workbook")
+
+
+# Function to load the shared string table, joining rich-text runs and skipping phonetic hints
+def _shared_strings(zf):
+    try:
+        stream = zf.open('xl/sharedStrings.xml')
+    except KeyError:
+        return []
+
+    strings = []
+    parts = []
+    skip = 0
+    with stream:
+        for event, el in ET.iterparse(stream, events=('start', 'end')):
+            tag = _local(el.tag)
+            if tag == 'rPh':
+                skip += 1 if event == 'start' else -1
+            elif event == 'end' and tag == 't' and not skip:
+                parts.append(el.text or '')
+            elif event == 'end' and tag == 'si':
+                strings.append(''.join(parts))
+                parts = []
+                el.clear()
+    return strings
+
+
+# Function to convert one cell to the value pd.read_excel would give for it
+def _cell_value(cell_type, body, strings):
+    if cell_type == b'inlineStr':
+        value = unescape(b''.join(_INLINE_TEXT.findall(body)).decode('utf-8'))
+        return None if value in NA_STRINGS else value
+
+    match = _VALUE.search(body)
+    if match is None:
+        return None
+    raw = match.group(1)
+
+    if cell_type == b's':
+        value = strings[int(raw)]
+    elif cell_type == b'str':
+        value = unescape(raw.decode('utf-8'))
+    elif cell_type == b'b':
+        return raw == b'1'
+    elif cell_type == b'e':
+        return None
+    else:
+        number = float(raw)
+        return int(number) if number.is_integer() else number
+    return None if value in NA_STRINGS else value
+
+
+# Function to stream selected columns of one worksheet straight from the sheet XML.
+# The sheet is scanned in blocks cut after a whole cell; once the header is known only cells in
+# the selected columns are decoded. The first non-empty row is the header and must contain every
+# name in columns. Returns {column name: object array}; rows where all selected cells are empty are skipped.
+def read_sheet_columns(data, sheet_name, columns, block_size=1024 * 1024):
+    wanted = None      # column letters -> output position
+    values = [[] for _ in columns]
+    cells = re.compile(_CELL.replace(b'{cols}', rb'[A-Z]+'), re.S)
+
+    # Function to finish one sheet row: the first non-empty one becomes the header
+    def flush(row):
+        nonlocal wanted, cells
+        if wanted is None:
+            header = {str(v).strip(): col for col, v in reversed(row.items()) if v is not None}
+            if header:
+                missing = [name for name in columns if name not in header]
+                if missing:
+                    raise ValueError(f"Sheet '{sheet_name}' header is missing columns: {', '.join(missing)}")
+                wanted = {header[name]: i for i, name in enumerate(columns)}
+                cols = b'|'.join(re.escape(col) for col in wanted)
+                cells = re.compile(_CELL.replace(b'{cols}', cols), re.S)
+        elif any(v is not None for v in row.values()):
+            for col, i in wanted.items():
+                values[i].append(row.get(col))
+
+    with zipfile.ZipFile(io.BytesIO(data)) as zf:
+        path = _sheet_path(zf, sheet_name)
+        strings = _shared_strings(zf)
+
+        with zf.open(path) as stream:
+            row_num = None
+            row = {}
+            tail = b''
+            while True:
+                block = stream.read(block_size)
+                buffer = tail + block
+                if block:
+                    cut = buffer.rfind(b'</c>')
+                    if cut < 0:
+                        tail = buffer
+                        continue
+                    cut += len(b'</c>')
+                else:
+                    cut = len(buffer)
+                chunk, tail = buffer[:cut], buffer[cut:]
+
+                for match in cells.finditer(chunk):
+                    before, col, num, after, body = match.groups()
+                    if num != row_num:
+                        if row_num is not None:
+                            flush(row)
+                        row_num, row = num, {}
+                    if body is None or (wanted is not None and col not in wanted):
+                        continue
+                    type_match = _CELL_TYPE.search(before) or _CELL_TYPE.search(after)
+                    row[col] = _cell_value(type_match and type_match.group(1), body, strings)
+
+                if not block:
+                    break
+
+            if row_num is not None:
+                flush(row)
+
+    if wanted is None:
+        raise ValueError(f"Sheet '{sheet_name}' has no header row")
+
+    arrays = {}
+    for name, column in zip(columns, values):
+        array = np.empty(len(column), dtype=object)
+        array[:] = column
+        arrays[name] = array
+    return arrays